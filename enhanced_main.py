@@ -5,48 +5,79 @@ Integrates Intelligent Source Discovery Module with Enhanced Magentic-One Orches
 """
 
 import asyncio
+import atexit
+import hashlib
 import os
+import subprocess
 import sys
-import schedule
-import time
-import json
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import orjson
 import logging
-from datetime import datetime, timedelta
-import threading
-from typing import List, Dict, Optional
+import logging.handlers
+import queue
+from datetime import datetime
+from typing import List, Dict, Optional, Set, Tuple
+
+# Use the libuv event loop for the scraping/LLM fan-out when available
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 # Add src to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from database.models import DatabaseManager
-from scrapers.scrapy_runner import ScrapyRunner
+from database.models import DatabaseManager, GrantRecord
 from agents.intelligent_source_discovery import IntelligentSourceDiscoveryModule
 from agents.enhanced_magentic_orchestrator import EnhancedGrantOracleOrchestrator
 from notifications.slack_notifier import NotificationManager
 from api.flask_app import app
+from api.wsgi_server import serve, serve_in_background
+
+# Configure logging: callers only enqueue records, a listener thread does the I/O
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [logging.FileHandler('logs/enhanced_oracle.log'), logging.StreamHandler()]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
 
-# Configure logging
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# force: the agent modules imported above already called basicConfig
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/enhanced_oracle.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(log_queue)],
+    force=True
 )
 logger = logging.getLogger(__name__)
 
+# Scrapy's Twisted reactor needs the main thread and cannot be restarted, so
+# spiders run in a child process and the discovery cycle can overlap them
+SCRAPY_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'scrapers', 'scrapy_runner.py')
+
+def jdumps(obj) -> str:
+    """Pretty-print an object as JSON for the logs"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+# Deadline reminders already sent, kept across restarts
+NOTIFIED_DEADLINES_FILE = os.path.join('data', 'notified_deadlines.json')
+
 class EnhancedGrantOracleMain:
     """Enhanced main orchestrator with intelligent source discovery"""
     
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.scrapy_runner = ScrapyRunner()
         self.notification_manager = NotificationManager()
         
         # Initialize enhanced components
         self.source_discovery = None
         self.enhanced_orchestrator = None
+        self._init_lock = asyncio.Lock()
+        self._initialized = False
         
         # Initialize database
         self.db_manager.create_tables()
@@ -57,44 +88,70 @@ class EnhancedGrantOracleMain:
             'source_discovery_frequency_hours': 24,
             'grant_extraction_frequency_hours': 6,
             'min_source_score_threshold': 0.3,
-            'max_concurrent_extractions': 5
+            'max_concurrent_extractions': 5,
+            'source_discovery_cache_ttl_hours': 12
         }
         
         # State tracking
         self.last_source_discovery = None
         self.discovered_sources_cache = []
         
+        # Deadline reminders already sent, as "grant_id|deadline" keys
+        self._notified_deadlines: Set[str] = self._load_notified_deadlines()
+        
+        # Every URL already handed to the orchestrator
+        self._seen_urls: Set[str] = set()
+        
+        # Discovery results keyed by the mission inputs: (completed_at, sources)
+        self._discovery_results: Dict[str, Tuple[datetime, List[Dict]]] = {}
+        self.scheduler = None
+        
         logger.info("Enhanced Grant Oracle initialized")
         
     async def initialize_ai_components(self):
-        """Initialize AI-powered components"""
-        try:
-            # Initialize Intelligent Source Discovery Module
-            self.source_discovery = IntelligentSourceDiscoveryModule()
-            logger.info("Intelligent Source Discovery Module initialized")
-            
-            # Initialize Enhanced Orchestrator
-            self.enhanced_orchestrator = EnhancedGrantOracleOrchestrator()
-            logger.info("Enhanced Magentic-One Orchestrator initialized")
-            
-            # Add initial seed URLs to orchestrator
-            initial_urls = [
-                "https://seedfund.startupindia.gov.in/",
-                "https://birac.nic.in/call_details.aspx",
-                "https://tdb.gov.in/",
-                "https://startup.karnataka.gov.in/",
-                "https://startup.goa.gov.in/",
-                "https://villgro.org/",
-                "https://gailebank.gail.co.in/"
-            ]
-            self.enhanced_orchestrator.add_target_urls(initial_urls)
-            
-            return True
+        """Initialize AI-powered components (once, even if several jobs ask concurrently)"""
+        async with self._init_lock:
+            if self._initialized:
+                return True
             
-        except Exception as e:
-            logger.error(f"Failed to initialize AI components: {e}")
-            self.notification_manager.notify_error(f"AI initialization failed: {e}", "Initialization")
-            return False
+            try:
+                # Initialize Intelligent Source Discovery Module
+                self.source_discovery = IntelligentSourceDiscoveryModule(
+                    max_concurrency=self.config['max_concurrent_extractions']
+                )
+                logger.info("Intelligent Source Discovery Module initialized")
+                
+                # Initialize Enhanced Orchestrator
+                self.enhanced_orchestrator = EnhancedGrantOracleOrchestrator()
+                logger.info("Enhanced Magentic-One Orchestrator initialized")
+                
+                # Add initial seed URLs to orchestrator
+                initial_urls = [
+                    "https://seedfund.startupindia.gov.in/",
+                    "https://birac.nic.in/call_details.aspx",
+                    "https://tdb.gov.in/",
+                    "https://startup.karnataka.gov.in/",
+                    "https://startup.goa.gov.in/",
+                    "https://villgro.org/",
+                    "https://gailebank.gail.co.in/"
+                ]
+                self.add_target_urls(initial_urls)
+                
+                self._initialized = True
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize AI components: {e}")
+                self.notification_manager.notify_error(f"AI initialization failed: {e}", "Initialization")
+                return False
+    
+    def add_target_urls(self, urls: List[str]) -> int:
+        """Hand URLs to the orchestrator, skipping any it has already been given"""
+        new_urls = [url for url in dict.fromkeys(urls) if url not in self._seen_urls]
+        if new_urls:
+            self._seen_urls.update(new_urls)
+            self.enhanced_orchestrator.add_target_urls(new_urls)
+        return len(new_urls)
     
     async def run_intelligent_source_discovery(self) -> List[Dict]:
         """Run intelligent source discovery to find new grant sources"""
@@ -108,6 +165,15 @@ class EnhancedGrantOracleMain:
             return []
         
         try:
+            # The 02:00 job and the 6-hourly cycle can both ask for discovery; an
+            # identical mission that ran recently is answered from its results
+            cache_key = self._discovery_cache_key()
+            cached = self._discovery_results.get(cache_key)
+            ttl_seconds = self.config['source_discovery_cache_ttl_hours'] * 3600
+            if cached and (datetime.now() - cached[0]).total_seconds() < ttl_seconds:
+                logger.info(f"Reusing source discovery results from {cached[0].isoformat()}")
+                return cached[1]
+            
             # Run discovery mission
             discovered_sources = await self.source_discovery.run_discovery_mission(
                 max_new_sources=self.config['max_new_sources_per_day']
@@ -124,7 +190,7 @@ class EnhancedGrantOracleMain:
             # Add to orchestrator for grant extraction
             if high_quality_sources:
                 new_urls = [source['url'] for source in high_quality_sources]
-                self.enhanced_orchestrator.add_target_urls(new_urls)
+                self.add_target_urls(new_urls)
                 
                 # Cache for reporting
                 self.discovered_sources_cache = high_quality_sources
@@ -133,6 +199,7 @@ class EnhancedGrantOracleMain:
                 # Notify about new sources
                 self.notification_manager.notify_new_sources_discovered(len(high_quality_sources))
             
+            self._discovery_results = {cache_key: (datetime.now(), high_quality_sources)}
             return high_quality_sources
             
         except Exception as e:
@@ -140,7 +207,16 @@ class EnhancedGrantOracleMain:
             self.notification_manager.notify_error(f"Source discovery failed: {e}", "Source Discovery")
             return []
     
-    async def run_enhanced_grant_extraction(self) -> List[Dict]:
+    def _discovery_cache_key(self) -> str:
+        """Key a discovery mission by everything that shapes its result"""
+        mission = {
+            'seed_urls': sorted(self.source_discovery.seed_urls),
+            'max_new_sources': self.config['max_new_sources_per_day'],
+            'min_score': self.config['min_source_score_threshold']
+        }
+        return hashlib.sha256(orjson.dumps(mission, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    
+    async def run_enhanced_grant_extraction(self) -> List[GrantRecord]:
         """Run enhanced grant extraction from all target sources"""
         logger.info("Starting enhanced grant extraction")
         
@@ -153,31 +229,34 @@ class EnhancedGrantOracleMain:
         
         try:
             # Run discovery mission on all target URLs
-            discovered_grants = await self.enhanced_orchestrator.daily_discovery_mission()
+            discovered_grants = await self.enhanced_orchestrator.daily_discovery_mission(
+                max_concurrency=self.config['max_concurrent_extractions']
+            )
             
-            grants_processed = 0
-            new_grants = []
+            grants_to_save = []
             
             for result in discovered_grants:
                 if 'grant' in result:
-                    grant_data = result['grant']
-                    
-                    # Add metadata
-                    grant_data.update({
-                        'discovered_at': result['discovered_at'],
-                        'source_url': result['source_url'],
-                        'discovery_method': 'enhanced_ai'
-                    })
+                    grant = result['grant']
+                    if not grant.get('id') or not grant.get('title'):
+                        logger.warning(f"Skipping grant without id/title from {result['source_url']}")
+                        continue
                     
-                    # Save to database
-                    success = self.db_manager.upsert_grant(grant_data)
-                    if success:
-                        grants_processed += 1
-                        new_grants.append(grant_data)
-                        
-                        # Send notification for high-value grants
-                        if grant_data.get('typical_ticket_lakh', 0) > 10:  # > 10 lakhs
-                            self.notification_manager.notify_new_grant(grant_data)
+                    grants_to_save.append(GrantRecord.from_dict(
+                        grant,
+                        discovered_at=result['discovered_at'],
+                        source_url=result['source_url'],
+                        discovery_method='enhanced_ai'
+                    ))
+            
+            # Save to database in batches
+            new_grants = await asyncio.to_thread(self.db_manager.upsert_grants_bulk, grants_to_save)
+            grants_processed = len(new_grants)
+            
+            # Send notification for high-value grants once they are committed
+            for grant in new_grants:
+                if (grant.typical_ticket_lakh or 0) > 10:  # > 10 lakhs
+                    self.notification_manager.notify_new_grant(grant.to_row())
             
             logger.info(f"Enhanced extraction completed. Processed {grants_processed} grants")
             
@@ -197,18 +276,15 @@ class EnhancedGrantOracleMain:
         logger.info("Starting traditional Scrapy discovery")
         
         try:
-            # Run spiders
-            self.scrapy_runner.run_spiders(['birac', 'startup_india'])
+            # Run spiders (birac, startup_india) in a child process
+            subprocess.run([sys.executable, SCRAPY_RUNNER], check=True)
             
             # Get recent grants count
-            recent_grants = self.db_manager.get_grants(
-                filters={'status': 'live'}, 
-                limit=None
-            )
+            live_grants = self.db_manager.count_grants(status='live')
             
-            logger.info(f"Scrapy discovery completed. Total live grants: {len(recent_grants)}")
+            logger.info(f"Scrapy discovery completed. Total live grants: {live_grants}")
             
-            return len(recent_grants)
+            return live_grants
             
         except Exception as e:
             logger.error(f"Scrapy discovery failed: {e}")
@@ -218,34 +294,55 @@ class EnhancedGrantOracleMain:
     def check_deadlines(self):
         """Check for upcoming grant deadlines"""
         try:
-            # Get grants with deadlines in next 7 days
-            week_from_now = datetime.now() + timedelta(days=7)
+            # Get grants with deadlines in next 7 days, minus those already reminded
+            # about for the same deadline
+            expiring = self.db_manager.get_expiring_grants(days=7)
+            current_keys = {self._reminder_key(grant) for grant in expiring}
+            expiring_soon = [
+                grant for grant in expiring
+                if self._reminder_key(grant) not in self._notified_deadlines
+            ]
             
-            grants = self.db_manager.get_grants(filters={'status': 'live'})
-            expiring_soon = []
-            
-            for grant in grants:
-                if grant.next_deadline_iso:
-                    try:
-                        deadline = datetime.fromisoformat(grant.next_deadline_iso.replace('Z', '+00:00'))
-                        if deadline <= week_from_now:
-                            expiring_soon.append({
-                                'title': grant.title,
-                                'agency': grant.agency,
-                                'next_deadline_iso': grant.next_deadline_iso,
-                                'typical_ticket_lakh': grant.typical_ticket_lakh
-                            })
-                    except:
-                        continue
+            # Forget reminders whose grant has left the expiring set (deadline moved,
+            # grant closed or removed) so the file stays bounded
+            changed = not self._notified_deadlines <= current_keys
+            self._notified_deadlines &= current_keys
             
             if expiring_soon:
-                self.notification_manager.slack.notify_deadline_reminder(expiring_soon)
+                if self.notification_manager.slack.notify_deadline_reminder(expiring_soon):
+                    self._notified_deadlines.update(self._reminder_key(grant) for grant in expiring_soon)
+                    changed = True
                 logger.info(f"Sent deadline reminders for {len(expiring_soon)} grants")
             
+            if changed:
+                self._save_notified_deadlines()
+            
         except Exception as e:
             logger.error(f"Deadline check failed: {e}")
             self.notification_manager.notify_error(f"Deadline check failed: {e}", "Deadline Checker")
     
+    @staticmethod
+    def _reminder_key(grant: Dict) -> str:
+        """Identify a reminder by grant and deadline, so a moved deadline is reminded again"""
+        return f"{grant['id']}|{grant['next_deadline_iso']}"
+    
+    def _load_notified_deadlines(self) -> Set[str]:
+        """Load the reminders already sent in earlier runs"""
+        try:
+            with open(NOTIFIED_DEADLINES_FILE, 'rb') as f:
+                return set(orjson.loads(f.read()))
+        except FileNotFoundError:
+            return set()
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Ignoring unreadable {NOTIFIED_DEADLINES_FILE}: {e}")
+            return set()
+    
+    def _save_notified_deadlines(self):
+        """Persist the sent reminders so restarts don't repeat them"""
+        os.makedirs(os.path.dirname(NOTIFIED_DEADLINES_FILE), exist_ok=True)
+        with open(NOTIFIED_DEADLINES_FILE, 'wb') as f:
+            f.write(orjson.dumps(sorted(self._notified_deadlines)))
+    
     async def run_comprehensive_discovery_cycle(self):
         """Run a comprehensive discovery cycle combining all methods"""
         logger.info("=== Starting Comprehensive Grant Discovery Cycle ===")
@@ -253,21 +350,27 @@ class EnhancedGrantOracleMain:
         cycle_start = datetime.now()
         
         # Step 1: Intelligent Source Discovery (if due)
-        new_sources = []
-        if (not self.last_source_discovery or 
+        source_discovery_due = (
+            not self.last_source_discovery or 
             (datetime.now() - self.last_source_discovery).total_seconds() > 
-            self.config['source_discovery_frequency_hours'] * 3600):
-            
-            new_sources = await self.run_intelligent_source_discovery()
-        
-        # Step 2: Enhanced Grant Extraction
-        ai_grants = await self.run_enhanced_grant_extraction()
+            self.config['source_discovery_frequency_hours'] * 3600
+        )
         
-        # Step 3: Traditional Scrapy Discovery
-        scrapy_grants_count = self.run_traditional_scrapy_discovery()
+        async def discover_and_extract():
+            # Extraction covers the URLs that discovery adds, so these two stay in order
+            sources = await self.run_intelligent_source_discovery() if source_discovery_due else []
+            
+            # Step 2: Enhanced Grant Extraction
+            grants = await self.run_enhanced_grant_extraction()
+            return sources, grants
         
-        # Step 4: Check Deadlines
-        self.check_deadlines()
+        # Steps 3 and 4 (Scrapy and the deadline check) don't depend on the AI
+        # pipeline, so they run in worker threads alongside it
+        (new_sources, ai_grants), scrapy_grants_count, _ = await asyncio.gather(
+            discover_and_extract(),
+            asyncio.to_thread(self.run_traditional_scrapy_discovery),
+            asyncio.to_thread(self.check_deadlines)
+        )
         
         # Generate comprehensive report
         cycle_duration = (datetime.now() - cycle_start).total_seconds()
@@ -283,7 +386,7 @@ class EnhancedGrantOracleMain:
         }
         
         logger.info(f"Discovery cycle completed in {cycle_duration:.1f} seconds")
-        logger.info(f"Cycle report: {json.dumps(report, indent=2)}")
+        logger.info(f"Cycle report: {jdumps(report)}")
         
         # Send daily summary
         total_grants = len(ai_grants) + scrapy_grants_count
@@ -299,35 +402,58 @@ class EnhancedGrantOracleMain:
     
     def schedule_tasks(self):
         """Schedule recurring tasks"""
+        self.scheduler = AsyncIOScheduler(timezone='Asia/Kolkata')
+        
         # Comprehensive discovery every 6 hours
-        schedule.every(6).hours.do(lambda: asyncio.run(self.run_comprehensive_discovery_cycle()))
+        self.scheduler.add_job(self.run_comprehensive_discovery_cycle, 'interval', hours=6)
         
         # Source discovery daily at 2:00 AM IST
-        schedule.every().day.at("02:00").do(lambda: asyncio.run(self.run_intelligent_source_discovery()))
-        
-        # Grant extraction every 6 hours
-        schedule.every(6).hours.do(lambda: asyncio.run(self.run_enhanced_grant_extraction()))
+        self.scheduler.add_job(self.run_intelligent_source_discovery, 'cron', hour=2, minute=0)
         
-        # Deadline check every Monday at 9:00 AM
-        schedule.every().monday.at("09:00").do(self.check_deadlines)
+        # Deadline check every Monday at 9:00 AM (sync job, runs in the scheduler's thread pool)
+        self.scheduler.add_job(self.check_deadlines, 'cron', day_of_week='mon', hour=9, minute=0)
         
         logger.info("Enhanced tasks scheduled:")
-        logger.info("- Comprehensive discovery: Every 6 hours")
+        logger.info("- Comprehensive discovery (includes grant extraction): Every 6 hours")
         logger.info("- Source discovery: Daily at 02:00 IST")
-        logger.info("- Grant extraction: Every 6 hours")
         logger.info("- Deadline check: Monday 09:00 IST")
     
-    def run_scheduler(self):
-        """Run the task scheduler"""
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+    async def run_scheduler(self):
+        """Run the task scheduler on the current event loop until cancelled"""
+        self.scheduler.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.scheduler.shutdown(wait=False)
     
     def start_api_server(self):
-        """Start the Flask API server"""
+        """Start the API server (gunicorn gthread workers)"""
         port = int(os.environ.get('PORT', 5000))
         logger.info(f"Starting API server on port {port}")
-        app.run(host='0.0.0.0', port=port, debug=False)
+        serve('api.flask_app:app', port=port)
+    
+    async def run_full(self):
+        """Run the scheduler on this event loop and the API on its own threaded server"""
+        port = int(os.environ.get('PORT', 5000))
+        logger.info(f"Starting API server on port {port}")
+        server = serve_in_background(app, port=port)
+        try:
+            await self.run_scheduler()
+        finally:
+            server.shutdown()
+            await self.cleanup()
+    
+    async def run_once(self, coro):
+        """Run a one-off coroutine, then clean up on the same event loop
+        
+        The orchestrator's model clients and HTTP sessions are bound to the loop
+        they were created on, so they must be closed before that loop is torn
+        down rather than from a second asyncio.run.
+        """
+        try:
+            return await coro
+        finally:
+            await self.cleanup()
     
     async def cleanup(self):
         """Clean up resources"""
@@ -342,6 +468,7 @@ class EnhancedGrantOracleMain:
         logger.info(f"Mode: {mode}")
         logger.info(f"Database URL: {os.getenv('DATABASE_URL', 'Not configured')}")
         logger.info(f"OpenAI API Key: {'Configured' if os.getenv('OPENAI_API_KEY') else 'Not configured'}")
+        logger.info(f"Event loop: {'uvloop' if UVLOOP_AVAILABLE else 'asyncio'}")
         
         try:
             if mode == 'api':
@@ -351,48 +478,40 @@ class EnhancedGrantOracleMain:
             elif mode == 'scheduler':
                 # Run only scheduler
                 self.schedule_tasks()
-                self.run_scheduler()
+                asyncio.run(self.run_once(self.run_scheduler()))
                 
             elif mode == 'discovery':
                 # Run discovery once
-                asyncio.run(self.run_comprehensive_discovery_cycle())
+                asyncio.run(self.run_once(self.run_comprehensive_discovery_cycle()))
                 
             elif mode == 'source_discovery':
                 # Run source discovery only
-                asyncio.run(self.run_intelligent_source_discovery())
+                asyncio.run(self.run_once(self.run_intelligent_source_discovery()))
                 
             elif mode == 'grant_extraction':
                 # Run grant extraction only
-                asyncio.run(self.run_enhanced_grant_extraction())
+                asyncio.run(self.run_once(self.run_enhanced_grant_extraction()))
                 
             elif mode == 'full':
                 # Run everything
                 self.schedule_tasks()
                 
-                # Start API server in a separate thread
-                api_thread = threading.Thread(target=self.start_api_server)
-                api_thread.daemon = True
-                api_thread.start()
-                
                 logger.info("✅ Enhanced Grant Oracle fully operational!")
                 logger.info("🔍 Intelligent source discovery enabled")
                 logger.info("🤖 Enhanced AI-powered grant extraction active")
-                logger.info("🌐 API server running in background")
-                logger.info("⏰ Scheduler running in foreground")
+                logger.info("🌐 API server in background threads, ⏰ scheduler on the event loop")
                 
-                # Run scheduler in main thread
-                self.run_scheduler()
+                asyncio.run(self.run_full())
             
             else:
                 logger.error(f"Unknown mode: {mode}")
                 print("Available modes: full, api, scheduler, discovery, source_discovery, grant_extraction")
                 
         except KeyboardInterrupt:
+            # asyncio.run cancels the running task first, so cleanup has already run
             logger.info("Shutting down Enhanced Grant Oracle...")
-            asyncio.run(self.cleanup())
         except Exception as e:
             logger.error(f"Fatal error: {e}")
-            asyncio.run(self.cleanup())
             raise
 
 def main():
@@ -5,35 +5,69 @@ Orchestrates the multi-agent system for grant discovery and notification
 """
 
 import asyncio
+import json
 import os
+import re
+import subprocess
 import sys
-import schedule
-import time
-from datetime import datetime, timedelta
-import threading
+from datetime import datetime
+import aiohttp
+from aiolimiter import AsyncLimiter
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+try:
+    import aiodns  # noqa: F401 - backs aiohttp.AsyncResolver
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
 
 # Set Windows event loop policy for better async support
+UVLOOP_AVAILABLE = False
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+else:
+    # Use the libuv event loop for the discovery fan-out when available
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        UVLOOP_AVAILABLE = True
+    except ImportError:
+        pass
 
 # Add src to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from database.models import DatabaseManager
-from scrapers.scrapy_runner import ScrapyRunner
 from agents.multi_model_orchestrator import MultiModelOrchestrator
 from agents.simple_orchestrator import SimpleGrantOrchestrator
+from agents.discovery_cache import DiscoveryResponseCache
 from notifications.slack_notifier import NotificationManager
 from api.flask_app import app
+from api.wsgi_server import serve, serve_in_background
+
+# Scrapy's Twisted reactor needs the main thread and cannot be restarted, so
+# each scheduled run starts the spiders in a child process
+SCRAPY_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'scrapers', 'scrapy_runner.py')
+
+# Where a JSON value may start in an agent's reply
+JSON_START = re.compile(r'[\[{]')
 
 class GrantOracleMain:
     """Main orchestrator for the India Startup Grant Oracle"""
     
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.scrapy_runner = ScrapyRunner()
         self.notification_manager = NotificationManager()
         self.magentic_orchestrator = None
+        self.scheduler = None
+        self._init_lock = asyncio.Lock()
+        self.http_session = None
+        
+        # Extraction results keyed on page content, so unchanged pages skip the LLM
+        self.response_cache = DiscoveryResponseCache(
+            redis_url=os.getenv('REDIS_URL'),
+            ttl_seconds=int(os.getenv('DISCOVERY_CACHE_TTL', 86400))
+        )
         
         # Initialize database
         self.db_manager.create_tables()
@@ -49,7 +83,13 @@ class GrantOracleMain:
         ]
         
     async def initialize_magentic_one(self):
-        """Initialize Magentic-One orchestrator"""
+        """Initialize Magentic-One orchestrator (once; later runs reuse it and its model clients)"""
+        async with self._init_lock:
+            if not self.magentic_orchestrator:
+                await self._create_orchestrator()
+    
+    async def _create_orchestrator(self):
+        """Create the Magentic-One orchestrator, falling back to the simplified one"""
         try:
             self.magentic_orchestrator = MultiModelOrchestrator()
             print("Magentic-One orchestrator initialized successfully")
@@ -63,26 +103,42 @@ class GrantOracleMain:
                 print(f"Failed to initialize simplified orchestrator: {e2}")
                 self.notification_manager.notify_error(f"All orchestrator initialization failed: {e}", "Orchestrator")
     
+    def get_http_session(self):
+        """Shared HTTP session for page fetches, created on first use on the running loop
+        
+        Kept for the life of the process so resolved hosts (DNS cache) and
+        keep-alive connections carry over between URLs and runs.
+        """
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(
+                resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+                use_dns_cache=True,
+                ttl_dns_cache=600,
+                limit_per_host=4
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': 'India Grants Oracle Bot 1.0'}
+            )
+        return self.http_session
+    
     def run_scrapy_discovery(self):
         """Run Scrapy-based discovery"""
         print(f"Starting Scrapy discovery at {datetime.now()}")
         
         try:
-            # Run spiders
-            self.scrapy_runner.run_spiders(['birac', 'startup_india'])
+            # Run spiders (birac, startup_india)
+            subprocess.run([sys.executable, SCRAPY_RUNNER], check=True)
             
             # Get recent grants count
-            recent_grants = self.db_manager.get_grants(
-                filters={'status': 'live'}, 
-                limit=None
-            )
+            live_grants = self.db_manager.count_grants(status='live')
             
-            print(f"Scrapy discovery completed. Total grants: {len(recent_grants)}")
+            print(f"Scrapy discovery completed. Total grants: {live_grants}")
             
             # Send daily summary
             self.notification_manager.notify_daily_summary(
-                grants_found=len(recent_grants), 
-                total_grants=len(recent_grants)
+                grants_found=live_grants, 
+                total_grants=live_grants
             )
             
         except Exception as e:
@@ -101,87 +157,117 @@ class GrantOracleMain:
         print(f"Starting Magentic-One discovery at {datetime.now()}")
         
         try:
-            # Process URLs one by one to avoid team state issues
-            grants_processed = 0
-            successful_urls = 0
+            # Every discover_grants_from_url call builds its own team, so URLs can
+            # be processed concurrently; the semaphore caps parallel LLM/browser load
+            semaphore = asyncio.BoundedSemaphore(int(os.getenv('MAGENTIC_CONCURRENCY', '3')))
+            # Token bucket for politeness towards the portals, instead of fixed sleeps
+            limiter = AsyncLimiter(max_rate=int(os.getenv('MAGENTIC_URLS_PER_MINUTE', '6')), time_period=60)
             
-            for url in self.target_urls:
-                try:
+            model_id = getattr(self.magentic_orchestrator, 'current_model', None) \
+                or type(self.magentic_orchestrator).__name__
+            
+            async def process_url(session, url):
+                async with semaphore, limiter:
                     print(f"Processing URL: {url}")
                     
-                    # Add timeout for each URL processing - shorter timeout
-                    async with asyncio.timeout(120):  # 2 minute timeout per URL
-                        # Discover grants from single URL
-                        grants_data = await self.magentic_orchestrator.discover_grants_from_url(url)
-                        
-                        if grants_data and isinstance(grants_data, list):
-                            for grant in grants_data:
-                                success = self.db_manager.upsert_grant(grant)
-                                if success:
-                                    grants_processed += 1
-                                    # Send notification for new grant
-                                    self.notification_manager.notify_new_grant(grant)
+                    # Backstop only: the page fetch and each LLM attempt have their own timeouts
+                    async with asyncio.timeout(180):
+                        # Reuse the last extraction if the page content is unchanged
+                        content_hash = await self.response_cache.fingerprint(session, url)
+                        cache_key = content_hash and self.response_cache.key(url, content_hash, model_id)
+                        if cache_key:
+                            cached = await self.response_cache.get(cache_key)
+                            if cached is not None:
+                                print(f"♻️ Page unchanged, reusing extracted grants for {url}")
+                                return cached
                         
-                        successful_urls += 1
-                        print(f"✅ Successfully processed {url}")
-                    
-                    # Add delay between URLs to avoid overwhelming
-                    await asyncio.sleep(10)  # Increased to 10 seconds for rate limiting
-                    
-                except asyncio.TimeoutError:
+                        result = await self.magentic_orchestrator.discover_grants_from_url(url)
+                        grants_data = self._grants_from_result(result)
+                        if cache_key and grants_data:
+                            await self.response_cache.set(cache_key, grants_data)
+                        return grants_data
+            
+            session = self.get_http_session()
+            results = await asyncio.gather(
+                *(process_url(session, url) for url in self.target_urls),
+                return_exceptions=True
+            )
+            
+            # Collect every URL's grants, then write them in batches and send a
+            # single notification instead of one round-trip and message per grant
+            pending_grants = []
+            successful_urls = 0
+            
+            for url, grants_data in zip(self.target_urls, results):
+                if isinstance(grants_data, asyncio.TimeoutError):
                     print(f"⏰ Timeout processing {url}")
                     continue
-                except Exception as e:
-                    print(f"❌ Error processing {url}: {e}")
+                if isinstance(grants_data, Exception):
+                    print(f"❌ Error processing {url}: {grants_data}")
                     continue
+                
+                pending_grants.extend(grants_data)
+                
+                successful_urls += 1
+                print(f"✅ Successfully processed {url}")
+            
+            # Blocking DB write, kept off the event loop
+            saved_grants = await asyncio.to_thread(self.db_manager.upsert_grants_bulk, pending_grants)
+            grants_processed = len(saved_grants)
+            for grant in saved_grants:
+                self.notification_manager.queue_new_grant(grant)
             
             print(f"Magentic-One discovery completed. Processed {grants_processed} grants from {successful_urls}/{len(self.target_urls)} URLs")
+            print(f"Discovery cache: {self.response_cache.get_stats()}")
             
         except Exception as e:
             print(f"Magentic-One discovery failed: {e}")
             self.notification_manager.notify_error(f"Magentic-One discovery failed: {e}", "Magentic-One")
     
+    def _grants_from_result(self, result):
+        """Grant dicts from an orchestrator result, ready for upsert_grants_bulk
+        
+        The simplified orchestrator returns a list of grants; Magentic-One returns
+        an agent message whose text holds them as JSON, either a list, a
+        {"grants": [...]} object or a single grant. Grants without an id are
+        dropped since the upsert is keyed on it.
+        """
+        if isinstance(result, list):
+            candidates = result
+        else:
+            content = getattr(result, 'content', None)
+            if content is None and hasattr(result, 'messages'):
+                content = ' '.join(
+                    message.content for message in result.messages
+                    if isinstance(getattr(message, 'content', None), str)
+                )
+            candidates = []
+            if isinstance(content, str):
+                # Decode each JSON value in the text in turn and take the first one holding grants
+                decoder = json.JSONDecoder()
+                match = JSON_START.search(content)
+                while match:
+                    try:
+                        data, end = decoder.raw_decode(content, match.start())
+                    except json.JSONDecodeError:
+                        end = match.start() + 1
+                    else:
+                        if isinstance(data, dict) and isinstance(data.get('grants'), list):
+                            data = data['grants']
+                        elif isinstance(data, dict) and 'id' in data:
+                            data = [data]
+                        if isinstance(data, list) and any(isinstance(item, dict) for item in data):
+                            candidates = data
+                            break
+                    match = JSON_START.search(content, end)
+        
+        return [grant for grant in candidates if isinstance(grant, dict) and grant.get('id')]
+    
     def check_deadlines(self):
         """Check for upcoming grant deadlines"""
         try:
-            # Get grants with deadlines in next 7 days
-            week_from_now = datetime.now() + timedelta(days=7)
-            # Ensure week_from_now is naive datetime for comparison
-            if week_from_now.tzinfo:
-                week_from_now = week_from_now.replace(tzinfo=None)
-            
-            grants = self.db_manager.get_grants(filters={'status': 'live'})
-            expiring_soon = []
-            
-            for grant in grants:
-                deadline_str = grant.next_deadline_iso
-                if deadline_str is not None:
-                    try:
-                        # Convert SQLAlchemy column to string
-                        deadline_str = str(deadline_str)
-                        
-                        # Handle both UTC and local time formats
-                        if deadline_str.endswith('Z'):
-                            deadline_str = deadline_str.replace('Z', '+00:00')
-                        elif '+' not in deadline_str and 'T' in deadline_str:
-                            # Assume UTC if no timezone info
-                            deadline_str = deadline_str + '+00:00'
-                        
-                        deadline = datetime.fromisoformat(deadline_str)
-                        # Convert to naive datetime for comparison
-                        if deadline.tzinfo:
-                            deadline = deadline.replace(tzinfo=None)
-                        
-                        if deadline <= week_from_now:
-                            expiring_soon.append({
-                                'title': grant.title,
-                                'agency': grant.agency,
-                                'next_deadline_iso': grant.next_deadline_iso,
-                                'typical_ticket_lakh': grant.typical_ticket_lakh
-                            })
-                    except Exception as e:
-                        print(f"Warning: Could not parse deadline for grant {grant.id}: {e}")
-                        continue
+            # Get grants with deadlines in next 7 days (filtered in the database)
+            expiring_soon = self.db_manager.get_expiring_grants(days=7)
             
             if expiring_soon:
                 self.notification_manager.slack.notify_deadline_reminder(expiring_soon)
@@ -191,47 +277,84 @@ class GrantOracleMain:
             print(f"Deadline check failed: {e}")
             self.notification_manager.notify_error(f"Deadline check failed: {e}", "Deadline Checker")
     
-    def run_daily_tasks(self):
+    async def run_daily_tasks(self):
         """Run all daily discovery tasks"""
         print("=== Starting Daily Grant Discovery Tasks ===")
         
-        # Run Scrapy discovery
-        self.run_scrapy_discovery()
+        # Run Scrapy discovery (blocking, so off the event loop)
+        await asyncio.to_thread(self.run_scrapy_discovery)
         
-        # Run Magentic-One discovery (async)
+        # Run Magentic-One discovery on this loop, reusing its orchestrator
         try:
-            asyncio.run(self.run_magentic_discovery())
+            await self.run_magentic_discovery()
         except Exception as e:
             print(f"Failed to run Magentic-One discovery: {e}")
         
         # Check deadlines
-        self.check_deadlines()
+        await asyncio.to_thread(self.check_deadlines)
         
         print("=== Daily Discovery Tasks Completed ===")
     
     def schedule_tasks(self):
         """Schedule recurring tasks"""
+        self.scheduler = AsyncIOScheduler(timezone='Asia/Kolkata')
+        
         # Daily discovery at 6:00 AM IST
-        schedule.every().day.at("06:00").do(self.run_daily_tasks)
+        self.scheduler.add_job(self.run_daily_tasks, 'cron', hour=6, minute=0)
         
-        # Deadline check every Monday at 9:00 AM
-        schedule.every().monday.at("09:00").do(self.check_deadlines)
+        # Deadline check every Monday at 9:00 AM (sync job, runs in the scheduler's thread pool)
+        self.scheduler.add_job(self.check_deadlines, 'cron', day_of_week='mon', hour=9, minute=0)
         
         print("Tasks scheduled:")
         print("- Daily discovery: 06:00 IST")
         print("- Deadline check: Monday 09:00 IST")
     
-    def run_scheduler(self):
-        """Run the task scheduler"""
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+    async def run_scheduler(self):
+        """Run the task scheduler on the current event loop until cancelled"""
+        # Build the orchestrator up front so every scheduled run shares it
+        await self.initialize_magentic_one()
+        self.scheduler.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.scheduler.shutdown(wait=False)
+            await self.cleanup()
+    
+    async def run_discovery_once(self):
+        """Run the daily tasks once, then release the orchestrator"""
+        try:
+            await self.run_daily_tasks()
+        finally:
+            await self.cleanup()
+    
+    async def cleanup(self):
+        """Send queued notifications, then close the HTTP session, discovery cache and model clients"""
+        await self.notification_manager.flush_notifications()
+        await self.response_cache.close()
+        if self.http_session is not None:
+            await self.http_session.close()
+            self.http_session = None
+        if self.magentic_orchestrator:
+            result = self.magentic_orchestrator.close()
+            if asyncio.iscoroutine(result):
+                await result
+            self.magentic_orchestrator = None
     
     def start_api_server(self):
-        """Start the Flask API server"""
+        """Start the API server (gunicorn gthread workers)"""
         port = int(os.environ.get('PORT', 5000))
         print(f"Starting API server on port {port}")
-        app.run(host='0.0.0.0', port=port, debug=False)
+        serve('api.flask_app:app', port=port)
+    
+    async def run_full(self):
+        """Run the scheduler on this event loop and the API on its own threaded server"""
+        port = int(os.environ.get('PORT', 5000))
+        print(f"Starting API server on port {port}")
+        server = serve_in_background(app, port=port)
+        try:
+            await self.run_scheduler()
+        finally:
+            server.shutdown()
     
     def run(self, mode='full'):
         """Run the application"""
@@ -239,6 +362,7 @@ class GrantOracleMain:
         print(f"Mode: {mode}")
         print(f"Database URL: {os.getenv('DATABASE_URL', 'Not configured')}")
         print(f"OpenAI API Key: {'Configured' if os.getenv('OPENAI_API_KEY') else 'Not configured'}")
+        print(f"Event loop: {'uvloop' if UVLOOP_AVAILABLE else 'asyncio'}")
         
         if mode == 'api':
             # Run only API server
@@ -247,27 +371,20 @@ class GrantOracleMain:
         elif mode == 'scheduler':
             # Run only scheduler
             self.schedule_tasks()
-            self.run_scheduler()
+            asyncio.run(self.run_scheduler())
             
         elif mode == 'discovery':
             # Run discovery once
-            self.run_daily_tasks()
+            asyncio.run(self.run_discovery_once())
             
         elif mode == 'full':
             # Run everything
             self.schedule_tasks()
             
-            # Start API server in a separate thread
-            api_thread = threading.Thread(target=self.start_api_server)
-            api_thread.daemon = True
-            api_thread.start()
-            
             print("✅ Grant Oracle fully operational!")
-            print("API server running in background")
-            print("Scheduler running in foreground")
+            print("API server in background threads, scheduler on the event loop")
             
-            # Run scheduler in main thread
-            self.run_scheduler()
+            asyncio.run(self.run_full())
         
         else:
             print(f"Unknown mode: {mode}")
@@ -57,6 +57,34 @@ CREATE INDEX IF NOT EXISTS idx_grants_sectors_gin ON grants USING GIN(sector_tag
 -- Create text search index for title and agency
 CREATE INDEX IF NOT EXISTS idx_grants_text_search ON grants USING GIN(to_tsvector('english', title || ' ' || agency));
 
+-- Trigram indexes so ILIKE '%term%' searches on title/agency use an index scan
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_grants_title_trgm ON grants USING GIN(title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_grants_agency_trgm ON grants USING GIN(agency gin_trgm_ops);
+
+-- Containment-only index for sector_tags @> '["sector"]' filters
+CREATE INDEX IF NOT EXISTS idx_grants_sectors_path_gin ON grants USING GIN(sector_tags jsonb_path_ops);
+
+-- Composite index for the /grants filter path (non-duplicate grants only)
+CREATE INDEX IF NOT EXISTS idx_grants_filter ON grants(status, bucket, application_complexity)
+    WHERE is_duplicate IS NOT TRUE;
+
+-- Work list for /grants/monitor (live grants by last check time)
+CREATE INDEX IF NOT EXISTS idx_grants_last_checked ON grants(last_checked_iso)
+    WHERE status = 'live';
+
+-- Effective ticket bounds so the /grants amount filters hit a single btree column
+ALTER TABLE grants ADD COLUMN IF NOT EXISTS effective_max_lakh DECIMAL(10,2)
+    GENERATED ALWAYS AS (GREATEST(typical_ticket_lakh, max_ticket_lakh)) STORED;
+ALTER TABLE grants ADD COLUMN IF NOT EXISTS effective_min_lakh DECIMAL(10,2)
+    GENERATED ALWAYS AS (LEAST(typical_ticket_lakh, min_ticket_lakh)) STORED;
+CREATE INDEX IF NOT EXISTS idx_grants_effective_max ON grants(effective_max_lakh);
+CREATE INDEX IF NOT EXISTS idx_grants_effective_min ON grants(effective_min_lakh);
+
+-- Keyset pagination order for /grants and /grants/search
+CREATE INDEX IF NOT EXISTS idx_grants_keyset
+    ON grants((COALESCE(confidence, 0)) DESC, (COALESCE(typical_ticket_lakh, 0)) DESC, id DESC);
+
 -- Insert sample data
 INSERT INTO grants (
     id, title, bucket, instrument, min_ticket_lakh, max_ticket_lakh, typical_ticket_lakh,
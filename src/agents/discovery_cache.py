@@ -0,0 +1,148 @@
+"""
+Discovery Response Cache
+Reuses extracted grants for pages whose content has not changed since the last run
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction prompt changes so old answers are not reused
+PROMPT_VERSION = 2
+
+
+class DiscoveryResponseCache:
+    """
+    Cache of extraction results keyed on the fetched page content
+
+    A cheap GET of the page is hashed together with the URL, model and prompt
+    version; if the same key was answered before, the LLM run is skipped.
+    The GET is conditional (ETag / Last-Modified), so an unchanged page costs a
+    304 and reuses the previous content hash without downloading the body.
+    Results live in Redis when a URL is configured, otherwise in process memory.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 86400):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        # url -> {'etag', 'last_modified', 'content_hash'} from the last full fetch
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._redis = None
+
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = aioredis.from_url(redis_url)
+        elif redis_url:
+            logger.warning("redis is not installed, caching discovery results in memory")
+
+    async def fingerprint(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Hash the page body, or None if the page could not be fetched"""
+        validators = await self._get_validators(url)
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=30, connect=5, sock_read=20)
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                if response.status == 304 and validators.get('content_hash'):
+                    return validators['content_hash']
+                if response.status != 200:
+                    return None
+                body = await response.read()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Could not fingerprint {url}: {e}")
+            return None
+
+        content_hash = hashlib.sha256(body).hexdigest()
+        await self._set_validators(url, {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_hash': content_hash
+        })
+        return content_hash
+
+    async def _get_validators(self, url: str) -> Dict[str, Optional[str]]:
+        """Conditional-request validators stored for a URL"""
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get('discovery:validators:' + url)
+                return json.loads(raw) if raw is not None else {}
+            except Exception as e:
+                logger.warning(f"Discovery cache read failed: {e}")
+                return {}
+        return self._validators.get(url, {})
+
+    async def _set_validators(self, url: str, validators: Dict[str, Optional[str]]) -> None:
+        """Store conditional-request validators for a URL"""
+        if self._redis is not None:
+            try:
+                await self._redis.set('discovery:validators:' + url, json.dumps(validators))
+            except Exception as e:
+                logger.warning(f"Discovery cache write failed: {e}")
+        else:
+            self._validators[url] = validators
+
+    def key(self, url: str, content_hash: str, model_id: str) -> str:
+        """Cache key for one extraction of one version of a page"""
+        raw = f"{url}|{content_hash}|{model_id}|{PROMPT_VERSION}"
+        return 'discovery:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a cached extraction result, counting the hit or miss"""
+        value = None
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+                value = json.loads(raw) if raw is not None else None
+            except Exception as e:
+                logger.warning(f"Discovery cache read failed: {e}")
+        else:
+            entry = self._memory.get(key)
+            if entry and entry[0] > time.monotonic():
+                value = entry[1]
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store an extraction result for the configured TTL"""
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, json.dumps(value), ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Discovery cache write failed: {e}")
+        else:
+            now = time.monotonic()
+            self._memory = {k: v for k, v in self._memory.items() if v[0] > now}
+            self._memory[key] = (now + self.ttl_seconds, value)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit and miss counters since startup"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    async def close(self) -> None:
+        """Close the Redis connection, if any"""
+        if self._redis is not None:
+            await self._redis.close()
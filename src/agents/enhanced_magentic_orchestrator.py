@@ -7,41 +7,273 @@ import asyncio
 import os
 import json
 import logging
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, Set
+from string import Template
+from typing import List, Dict, Optional
 from urllib.parse import urlparse
 
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
+
+try:
+    import aiodns  # noqa: F401 - backs aiohttp.AsyncResolver
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_ext.teams.magentic_one import MagenticOne
 from autogen_ext.agents.web_surfer import MultimodalWebSurfer
 from autogen_ext.agents.file_surfer import FileSurfer
-from autogen_ext.agents.magentic_one import MagenticOneCoderAgent
-from autogen_agentchat.agents import CodeExecutorAgent
-from autogen_ext.code_executors.local import LocalCommandLineCodeExecutor
 from autogen_agentchat.teams import MagenticOneGroupChat
+from autogen_core.models import SystemMessage, UserMessage
+
+from agents.discovery_cache import DiscoveryResponseCache
+from agents.llm_gate import LLMGate
+from agents.url_state import BloomFilter, FeedbackStore, RedisSet, connect as connect_url_state
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Normalization rules and target schema shared by the validation prompts
+VALIDATION_RULES = """Required schema validation and normalization:
+        1. Ensure all required fields are present
+        2. Validate data types and formats
+        3. Normalize funding amounts to lakhs
+        4. Standardize date formats to ISO
+        5. Clean and categorize eligibility criteria
+        6. Standardize sector tags and bucket classifications
+        7. Generate unique IDs based on title and agency
+        8. Calculate confidence scores based on data completeness
+        9. Validate URLs and contact information
+        10. Ensure status is correctly set based on deadlines
+        
+        Schema requirements:
+        {
+            "id": "unique_identifier",
+            "title": "Grant Title",
+            "bucket": "Ideation|MVP Prototype|Early Stage|Growth|Infra",
+            "instrument": ["grant", "loan", "subsidy", "equity", "debt"],
+            "min_ticket_lakh": float,
+            "max_ticket_lakh": float,
+            "typical_ticket_lakh": float,
+            "deadline_type": "rolling|batch_call|annual|closed_waitlist",
+            "next_deadline_iso": "ISO date string or null",
+            "eligibility_flags": ["criteria1", "criteria2"],
+            "sector_tags": ["sector1", "sector2"],
+            "state_scope": "national|state_name",
+            "agency": "Agency Name",
+            "source_urls": ["url1", "url2"],
+            "confidence": 0.0-1.0,
+            "status": "live|expired|draft"
+        }"""
+
+# Task prompts keep their fixed instructions and schema ahead of the per-call
+# values, so every call shares one prompt prefix that the provider can cache
+DISCOVERY_TASK = Template("""
+        Extract all grant, funding, and scheme information available on the page given below and any linked pages.
+        For each grant found, extract:
+        1. Title/Name of the grant
+        2. Funding amount (minimum, maximum, typical) - convert to lakhs
+        3. Deadline information (dates, rolling, batch calls)
+        4. Eligibility criteria
+        5. Application process and requirements
+        6. Contact information
+        7. Sector/domain focus
+        8. Geographic scope (national, state-specific)
+        9. Stage focus (ideation, MVP, growth, etc.)
+        
+        Important instructions:
+        - Look for PDF documents, application forms, and detailed program pages
+        - Follow relevant links to get complete information
+        - If the page has navigation menus, explore grant/funding sections
+        - Extract exact dates and convert relative dates to absolute dates
+        - Identify the funding agency/organization clearly
+        - Note if applications are currently open or closed
+        
+        Format the results as structured JSON data matching this schema:
+        {
+            "grants": [
+                {
+                    "title": "Grant Name",
+                    "agency": "Funding Agency",
+                    "min_ticket_lakh": 0.0,
+                    "max_ticket_lakh": 0.0,
+                    "typical_ticket_lakh": 0.0,
+                    "deadline_type": "rolling|batch_call|annual|closed_waitlist",
+                    "next_deadline_iso": "ISO date string or null",
+                    "eligibility_flags": ["criteria1", "criteria2"],
+                    "sector_tags": ["sector1", "sector2"],
+                    "state_scope": "national|state_name",
+                    "bucket": "Ideation|MVP Prototype|Early Stage|Growth|Infra",
+                    "instrument": ["grant", "loan", "subsidy"],
+                    "source_urls": ["the visited URL"],
+                    "status": "live|expired|draft",
+                    "confidence": 0.0-1.0
+                }
+            ],
+            "source_quality": {
+                "relevance": 0.0-1.0,
+                "data_completeness": 0.0-1.0,
+                "update_frequency": 0.0-1.0
+            }
+        }
+        
+        If no grants are found, return an empty grants array but still assess source quality.
+        
+        Visit the URL: $url
+        
+        Focus area: $focus_area
+        """)
+
+PDF_TASK = Template("""
+        Extract all grant, funding, scheme, and subsidy information from the PDF document given below.
+        Look for:
+        1. Grant names and titles
+        2. Funding amounts (in lakhs/crores) - convert to lakhs
+        3. Application deadlines and timelines
+        4. Eligibility criteria and requirements
+        5. Application procedures and forms
+        6. Contact details and addresses
+        7. Sector specifications and focus areas
+        8. Geographic scope and limitations
+        
+        Pay special attention to:
+        - Tables with grant details
+        - Application forms and guidelines
+        - Deadline calendars
+        - Eligibility matrices
+        - Contact directories
+        
+        Convert all amounts to lakhs for consistency.
+        Format the extracted information as structured JSON matching our grant schema.
+        Include confidence scores based on data completeness and clarity.
+        
+        Read and analyze the PDF document at: $pdf_path
+        """)
+
+VALIDATION_TASK = Template("""
+        Validate and normalize the grant data below to match our schema.
+        Return the cleaned and validated data as JSON.
+        If data is insufficient or invalid, return null with explanation.
+        
+        Raw data: $raw_data
+        """)
+
+BATCH_VALIDATION_TASK = Template("""
+        Validate and normalize each of the $count grants below to match our schema.
+        Return JSON of the form {"validated": [...]} with exactly $count entries,
+        in the same order as the raw data, each being the cleaned and validated grant.
+        Use null for an entry whose data is insufficient or invalid.
+        
+        Raw data: $raw_data
+        """)
+
+# Grants validated per model call; bounds the prompt and answer size for large pages
+VALIDATION_BATCH_SIZE = 10
+
+# Pre-flight check before any agent run: pages smaller than this, or whose
+# first bytes and URL mention none of the keywords, are not worth an LLM run
+PREFLIGHT_MIN_BYTES = 1024
+PREFLIGHT_SNIFF_BYTES = 2048
+PREFLIGHT_KEYWORDS = (b'grant', b'fund', b'scheme', b'startup', b'incubat', b'seed', b'subsid')
+# Pre-flight statuses that, like any 5xx, may clear up on their own; such URLs stay pending
+PREFLIGHT_TEMPORARY_STATUSES = (408, 425, 429)
+
+# Politeness budget per host: agent runs per second and how many may start back to back
+HOST_RATE = 0.5
+HOST_BURST = 2
+
+# Slowest a throttled host's bucket is allowed to get, in agent runs per second
+HOST_MIN_RATE = 1 / 60
+
+class PreflightUnavailable(Exception):
+    """The pre-flight fetch failed for a reason that may clear up (timeout, 429, 5xx)"""
+
+
+class DiscoveryCancelled(Exception):
+    """The caller running a shared URL discovery was cancelled before it finished"""
+
+
 class EnhancedGrantOracleOrchestrator:
     """Enhanced Magentic-One orchestrator with dynamic URL support"""
     
+    # Validation is a pure schema transform, so it goes straight to the model;
+    # only the raw grants in the user message change between calls
+    VALIDATION_SYSTEM_PROMPT = f"""You validate and normalize Indian startup grant data.
+        
+        {VALIDATION_RULES}
+        
+        Respond with JSON only."""
+    
     def __init__(self, openai_api_key: Optional[str] = None):
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         if not self.openai_api_key:
             raise ValueError("OpenAI API key is required")
             
+        self.model_name = "gpt-4o-mini"
         self.model_client = OpenAIChatCompletionClient(
-            model="gpt-4o-mini",
+            model=self.model_name,
             api_key=self.openai_api_key
         )
         
-        # Dynamic URL management
-        self.target_urls: Set[str] = set()
-        self.processed_urls: Set[str] = set()
-        self.failed_urls: Set[str] = set()
-        self.url_feedback: Dict[str, Dict] = {}
+        # Validation is a plain schema transform, so VALIDATION_MODEL can move it
+        # to a cheaper tier; the client only accepts models autogen knows about
+        self.validation_model_name = os.getenv('VALIDATION_MODEL') or self.model_name
+        if self.validation_model_name == self.model_name:
+            self.cheap_client = self.model_client
+        else:
+            self.cheap_client = OpenAIChatCompletionClient(
+                model=self.validation_model_name,
+                api_key=self.openai_api_key
+            )
+        
+        # Every team run and model call passes this gate, which adapts concurrency
+        # to 429s / 5xx and keeps starts under the provider's request rate
+        self.llm_gate = LLMGate(
+            max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 8)),
+            requests_per_minute=int(os.getenv('LLM_REQUESTS_PER_MINUTE', 0)) or None
+        )
+        
+        # Dynamic URL management, kept in Redis (when configured) so dedup and
+        # feedback survive restarts and are shared between workers
+        self._url_state_redis = connect_url_state(os.getenv('REDIS_URL'))
+        self.target_urls = RedisSet(self._url_state_redis, 'target_urls')
+        # processed_urls only grows; a Bloom filter answers most lookups locally
+        self.processed_urls = RedisSet(
+            self._url_state_redis, 'processed_urls',
+            bloom=BloomFilter(capacity=int(os.getenv('PROCESSED_URLS_CAPACITY', 1_000_000)))
+        )
+        self.failed_urls = RedisSet(self._url_state_redis, 'failed_urls')
+        # Targets not yet processed, kept up to date so nothing has to diff the sets
+        self.pending_urls = RedisSet(self._url_state_redis, 'pending_urls')
+        if not len(self.pending_urls) and len(self.target_urls):
+            for url in self.target_urls - self.processed_urls:
+                self.pending_urls.add(url)
+        self.url_feedback = FeedbackStore(self._url_state_redis)
+        
+        # Extractions keyed on page content, so unchanged pages skip the agent run
+        # across missions and restarts (when Redis is configured)
+        self.response_cache = DiscoveryResponseCache(
+            redis_url=os.getenv('REDIS_URL'),
+            ttl_seconds=int(os.getenv('DISCOVERY_CACHE_TTL', 7 * 86400))
+        )
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        
+        # Missions are fanned out to Celery workers when a broker is configured
+        self.task_broker_url = os.getenv('CELERY_BROKER_URL')
+        
+        # Discovery runs in progress, so concurrent callers for a URL share one
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # URLs waiting for the workers of the running in-process mission, if any
+        self._url_queue: Optional[asyncio.Queue] = None
+        
+        # Token bucket per host, and the loop time until which a host asked us to wait
+        self._host_limiters: Dict[str, AsyncLimiter] = {}
+        self._host_paused_until: Dict[str, float] = {}
         
         # Performance tracking
         self.processing_stats = {
@@ -54,69 +286,106 @@ class EnhancedGrantOracleOrchestrator:
         self.setup_agents()
         
     def setup_agents(self):
-        """Setup Magentic-One agents for grant discovery"""
+        """Setup purpose-built Magentic-One teams for grant discovery
+        
+        Each task type gets a team holding only the agent it needs, so the
+        orchestrator never plans around agents the task cannot use. Grant
+        validation needs no agent at all and calls the model client directly.
+        """
+        self.web_team = self._build_web_team()
+        self.pdf_team = self._build_pdf_team()
         
-        # Web Surfer for browsing government portals
-        self.web_surfer = MultimodalWebSurfer(
+        # Teams available to concurrent URL workers (a team runs one task at a time)
+        self.web_teams: List[MagenticOneGroupChat] = [self.web_team]
+    
+    def _build_web_team(self) -> MagenticOneGroupChat:
+        """Build a team that browses government portals"""
+        web_surfer = MultimodalWebSurfer(
             "GovPortalAgent",
             model_client=self.model_client,
             description="Specialized agent for browsing government portals and extracting grant information"
         )
-        
-        # File Surfer for processing PDFs and documents
-        self.file_surfer = FileSurfer(
+        return MagenticOneGroupChat([web_surfer], model_client=self.model_client)
+    
+    def _build_pdf_team(self) -> MagenticOneGroupChat:
+        """Build a team that reads PDFs and documents"""
+        file_surfer = FileSurfer(
             "PDFExtractorAgent", 
             model_client=self.model_client,
             description="Agent for reading and extracting information from PDF documents and files"
         )
-        
-        # Coder for data processing and validation
-        self.coder = MagenticOneCoderAgent(
-            "SchemaCoder",
-            model_client=self.model_client,
-            description="Agent for validating data schemas and processing grant information"
-        )
-        
-        # Terminal for executing commands
-        self.terminal = CodeExecutorAgent(
-            "ComputerTerminal",
-            code_executor=LocalCommandLineCodeExecutor(),
-            description="Agent for executing system commands and scripts"
-        )
-        
-        # Create the Magentic-One team
-        self.team = MagenticOneGroupChat(
-            [self.web_surfer, self.file_surfer, self.coder, self.terminal],
-            model_client=self.model_client
-        )
+        return MagenticOneGroupChat([file_surfer], model_client=self.model_client)
     
     def add_target_urls(self, urls: List[str]) -> None:
-        """Add new target URLs to the processing queue"""
+        """Add new target URLs to the processing queue
+        
+        While a mission is running, new URLs go straight to its workers.
+        """
         for url in urls:
             if self._is_valid_url(url) and url not in self.processed_urls:
+                if self._url_queue is not None and url not in self.target_urls:
+                    self._url_queue.put_nowait(url)
                 self.target_urls.add(url)
+                self.pending_urls.add(url)
                 logger.info(f"Added target URL: {url}")
     
     def remove_target_url(self, url: str) -> None:
         """Remove a URL from the target list"""
         self.target_urls.discard(url)
+        self.pending_urls.discard(url)
         logger.info(f"Removed target URL: {url}")
     
     def get_pending_urls(self) -> List[str]:
         """Get list of URLs pending processing"""
-        return list(self.target_urls - self.processed_urls)
+        return list(self.pending_urls)
     
     def get_processing_stats(self) -> Dict:
         """Get current processing statistics"""
         return {
             **self.processing_stats,
-            'pending_urls': len(self.target_urls - self.processed_urls),
+            'pending_urls': len(self.pending_urls),
             'total_target_urls': len(self.target_urls),
-            'failed_urls': len(self.failed_urls)
+            'failed_urls': len(self.failed_urls),
+            'llm_gate': self.llm_gate.get_stats()
         }
     
-    async def discover_grants_from_url(self, url: str, focus_area: Optional[str] = None) -> Optional[Dict]:
-        """Discover grants from a specific URL with enhanced error handling"""
+    async def discover_grants_from_url(self, url: str, focus_area: Optional[str] = None,
+                                       team: Optional[MagenticOneGroupChat] = None) -> Optional[Dict]:
+        """Discover grants from a specific URL with enhanced error handling
+        
+        Concurrent calls for the same URL share one discovery run. If the caller
+        running it is cancelled, a waiting caller takes the run over.
+        """
+        while (inflight := self._inflight.get(url)) is not None:
+            logger.info(f"URL already being processed, waiting for it: {url}")
+            try:
+                return await asyncio.shield(inflight)
+            except DiscoveryCancelled:
+                # Only the owner was cancelled, not this caller; run it again
+                continue
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[url] = future
+        try:
+            grants_data = await self._discover_grants_from_url(url, focus_area, team)
+        except asyncio.CancelledError:
+            # Cancelling the future would cancel every waiter along with the owner
+            future.set_exception(DiscoveryCancelled(url))
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case no other caller was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(grants_data)
+            return grants_data
+        finally:
+            del self._inflight[url]
+    
+    async def _discover_grants_from_url(self, url: str, focus_area: Optional[str],
+                                        team: Optional[MagenticOneGroupChat]) -> Optional[Dict]:
         if url in self.processed_urls:
             logger.info(f"URL already processed: {url}")
             return self.url_feedback.get(url)
@@ -124,67 +393,53 @@ class EnhancedGrantOracleOrchestrator:
         logger.info(f"Processing URL: {url}")
         self.processing_stats['total_processed'] += 1
         
-        task = f"""
-        Visit the URL: {url}
-        
-        Extract all grant, funding, and scheme information available on this page and any linked pages.
-        For each grant found, extract:
-        1. Title/Name of the grant
-        2. Funding amount (minimum, maximum, typical) - convert to lakhs
-        3. Deadline information (dates, rolling, batch calls)
-        4. Eligibility criteria
-        5. Application process and requirements
-        6. Contact information
-        7. Sector/domain focus
-        8. Geographic scope (national, state-specific)
-        9. Stage focus (ideation, MVP, growth, etc.)
-        
-        Focus area: {focus_area or 'All startup grants and funding schemes for Indian entrepreneurs'}
-        
-        Important instructions:
-        - Look for PDF documents, application forms, and detailed program pages
-        - Follow relevant links to get complete information
-        - If the page has navigation menus, explore grant/funding sections
-        - Extract exact dates and convert relative dates to absolute dates
-        - Identify the funding agency/organization clearly
-        - Note if applications are currently open or closed
-        
-        Format the results as structured JSON data matching this schema:
-        {{
-            "grants": [
-                {{
-                    "title": "Grant Name",
-                    "agency": "Funding Agency",
-                    "min_ticket_lakh": 0.0,
-                    "max_ticket_lakh": 0.0,
-                    "typical_ticket_lakh": 0.0,
-                    "deadline_type": "rolling|batch_call|annual|closed_waitlist",
-                    "next_deadline_iso": "ISO date string or null",
-                    "eligibility_flags": ["criteria1", "criteria2"],
-                    "sector_tags": ["sector1", "sector2"],
-                    "state_scope": "national|state_name",
-                    "bucket": "Ideation|MVP Prototype|Early Stage|Growth|Infra",
-                    "instrument": ["grant", "loan", "subsidy"],
-                    "source_urls": ["{url}"],
-                    "status": "live|expired|draft",
-                    "confidence": 0.0-1.0
-                }}
-            ],
-            "source_quality": {{
-                "relevance": 0.0-1.0,
-                "data_completeness": 0.0-1.0,
-                "update_frequency": 0.0-1.0
-            }}
-        }}
+        task = DISCOVERY_TASK.safe_substitute(
+            url=url,
+            focus_area=focus_area or 'All startup grants and funding schemes for Indian entrepreneurs'
+        )
         
-        If no grants are found, return an empty grants array but still assess source quality.
-        """
+        # Dead, tiny or off-topic pages are skipped without an agent run
+        try:
+            skip_reason = await self._quick_check(url)
+        except PreflightUnavailable as e:
+            # Not marked processed: the URL stays pending and is tried again later
+            self.processing_stats['failed_extractions'] += 1
+            self.url_feedback[url] = {
+                'url': url,
+                'processed_at': datetime.now().isoformat(),
+                'grants_found': 0,
+                'success': False,
+                'error': str(e)
+            }
+            logger.warning(f"Pre-flight check failed for {url}, will retry: {e}")
+            return None
+        if skip_reason:
+            self.processing_stats['failed_extractions'] += 1
+            self.failed_urls.add(url)
+            self.url_feedback[url] = {
+                'url': url,
+                'processed_at': datetime.now().isoformat(),
+                'grants_found': 0,
+                'success': False,
+                'skipped': True,
+                'error': skip_reason
+            }
+            logger.info(f"Skipping {url}: {skip_reason}")
+            self._mark_processed(url)
+            return None
         
         try:
-            result = await self.team.run_stream(task=task)
+            # Reuse the last extraction if the page content is unchanged
+            content_hash = await self.response_cache.fingerprint(self._get_http_session(), url)
+            cache_key = content_hash and self.response_cache.key(url, content_hash, self.model_name)
+            grants_data = await self.response_cache.get(cache_key) if cache_key else None
             
-            # Process the result
-            grants_data = self._extract_grants_from_result(result)
+            if grants_data is not None:
+                logger.info(f"Page unchanged, reusing extracted grants for {url}")
+            else:
+                grants_data = await self.llm_gate.call(lambda: self._run_team(team or self.web_team, task))
+                if cache_key and grants_data:
+                    await self.response_cache.set(cache_key, grants_data)
             
             if grants_data:
                 self.processing_stats['successful_extractions'] += 1
@@ -218,7 +473,7 @@ class EnhancedGrantOracleOrchestrator:
                 
                 logger.warning(f"No grants extracted from {url}")
             
-            self.processed_urls.add(url)
+            self._mark_processed(url)
             return grants_data
             
         except Exception as e:
@@ -235,40 +490,70 @@ class EnhancedGrantOracleOrchestrator:
             self.url_feedback[url] = feedback
             
             logger.error(f"Error discovering grants from {url}: {e}")
-            self.processed_urls.add(url)
+            self._mark_processed(url)
             return None
     
-    async def process_pdf_document(self, pdf_path: str) -> Optional[Dict]:
-        """Process a PDF document to extract grant information"""
-        task = f"""
-        Read and analyze the PDF document at: {pdf_path}
-        
-        Extract all grant, funding, scheme, and subsidy information from this document.
-        Look for:
-        1. Grant names and titles
-        2. Funding amounts (in lakhs/crores) - convert to lakhs
-        3. Application deadlines and timelines
-        4. Eligibility criteria and requirements
-        5. Application procedures and forms
-        6. Contact details and addresses
-        7. Sector specifications and focus areas
-        8. Geographic scope and limitations
+    def _mark_processed(self, url: str) -> None:
+        """Record that a URL has been processed, successfully or not"""
+        self.processed_urls.add(url)
+        self.pending_urls.discard(url)
+    
+    async def _quick_check(self, url: str) -> Optional[str]:
+        """Cheap pre-flight fetch of the page head; returns why to skip it, or None
         
-        Pay special attention to:
-        - Tables with grant details
-        - Application forms and guidelines
-        - Deadline calendars
-        - Eligibility matrices
-        - Contact directories
+        Raises PreflightUnavailable when the page could not be judged right now.
+        """
+        try:
+            timeout = aiohttp.ClientTimeout(total=5)
+            headers = {'Range': f'bytes=0-{PREFLIGHT_SNIFF_BYTES - 1}'}
+            async with self._get_http_session().get(url, headers=headers, timeout=timeout) as response:
+                self._observe_host_headers(urlparse(url).netloc, response.status, response.headers)
+                if response.status in PREFLIGHT_TEMPORARY_STATUSES or response.status >= 500:
+                    raise PreflightUnavailable(f"HTTP {response.status}")
+                if response.status not in (200, 206):
+                    return f"HTTP {response.status}"
+                head = await response.content.read(PREFLIGHT_SNIFF_BYTES)
+                # A ranged reply gives the full size after the '/' in Content-Range
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                size = int(total) if total.isdigit() else response.content_length
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise PreflightUnavailable(f"unreachable ({e.__class__.__name__})") from e
+        
+        if size is None and len(head) < PREFLIGHT_SNIFF_BYTES:
+            size = len(head)
+        if size is not None and size < PREFLIGHT_MIN_BYTES:
+            return f"page too small ({size} bytes)"
+        
+        sniff = head.lower() + url.lower().encode('utf-8', 'ignore')
+        if not any(keyword in sniff for keyword in PREFLIGHT_KEYWORDS):
+            return "no grant keywords on page"
+        return None
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Shared session for the page fingerprint requests
         
-        Convert all amounts to lakhs for consistency.
-        Format the extracted information as structured JSON matching our grant schema.
-        Include confidence scores based on data completeness and clarity.
+        One pooled connector serves every URL, so repeat visits to the same
+        portals reuse open connections and cached DNS answers.
         """
+        if self._http_session is None or self._http_session.closed:
+            connector = aiohttp.TCPConnector(
+                resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+                limit=64,
+                limit_per_host=8,
+                ttl_dns_cache=300
+            )
+            self._http_session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': 'India Grants Oracle Bot 1.0'}
+            )
+        return self._http_session
+    
+    async def process_pdf_document(self, pdf_path: str) -> Optional[Dict]:
+        """Process a PDF document to extract grant information"""
+        task = PDF_TASK.safe_substitute(pdf_path=pdf_path)
         
         try:
-            result = await self.team.run_stream(task=task)
-            grants_data = self._extract_grants_from_result(result)
+            grants_data = await self.llm_gate.call(lambda: self._run_team(self.pdf_team, task))
             
             if grants_data:
                 logger.info(f"Successfully processed PDF: {pdf_path}")
@@ -281,52 +566,45 @@ class EnhancedGrantOracleOrchestrator:
             logger.error(f"Error processing PDF {pdf_path}: {e}")
             return None
     
-    async def validate_and_normalize_grant_data(self, raw_grant_data: Dict) -> Optional[Dict]:
-        """Validate and normalize grant data using the coder agent"""
-        task = f"""
-        Validate and normalize the following grant data to match our schema:
-        
-        Raw data: {json.dumps(raw_grant_data, indent=2)}
-        
-        Required schema validation and normalization:
-        1. Ensure all required fields are present
-        2. Validate data types and formats
-        3. Normalize funding amounts to lakhs
-        4. Standardize date formats to ISO
-        5. Clean and categorize eligibility criteria
-        6. Standardize sector tags and bucket classifications
-        7. Generate unique IDs based on title and agency
-        8. Calculate confidence scores based on data completeness
-        9. Validate URLs and contact information
-        10. Ensure status is correctly set based on deadlines
+    async def _run_team(self, team: MagenticOneGroupChat, task: str,
+                        keys=('grants', 'grant')) -> Optional[Dict]:
+        """Run a team task and return the first answer JSON its messages carry
         
-        Schema requirements:
-        {{
-            "id": "unique_identifier",
-            "title": "Grant Title",
-            "bucket": "Ideation|MVP Prototype|Early Stage|Growth|Infra",
-            "instrument": ["grant", "loan", "subsidy", "equity", "debt"],
-            "min_ticket_lakh": float,
-            "max_ticket_lakh": float,
-            "typical_ticket_lakh": float,
-            "deadline_type": "rolling|batch_call|annual|closed_waitlist",
-            "next_deadline_iso": "ISO date string or null",
-            "eligibility_flags": ["criteria1", "criteria2"],
-            "sector_tags": ["sector1", "sector2"],
-            "state_scope": "national|state_name",
-            "agency": "Agency Name",
-            "source_urls": ["url1", "url2"],
-            "confidence": 0.0-1.0,
-            "status": "live|expired|draft"
-        }}
-        
-        Return the cleaned and validated data as JSON.
-        If data is insufficient or invalid, return null with explanation.
+        Messages are scanned as they stream in, so the run stops as soon as the
+        answer arrives instead of paying for further orchestrator turns.
         """
+        stream = team.run_stream(task=task)
+        try:
+            async for message in stream:
+                # The closing TaskResult repeats messages already scanned
+                if not isinstance(getattr(message, 'content', None), str):
+                    continue
+                data = self._extract_grants_from_result(message, keys=keys)
+                if data is not None:
+                    return data
+            return None
+        finally:
+            await stream.aclose()
+            # An early stop leaves the conversation mid-run; clear it for the next task
+            try:
+                await team.reset()
+            except Exception as e:
+                logger.debug(f"Team reset failed: {e}")
+    
+    async def _run_validation(self, task: str, keys=('grants', 'grant')) -> Optional[Dict]:
+        """Send a validation task to the model in one completion call"""
+        result = await self.llm_gate.call(lambda: self.cheap_client.create([
+            SystemMessage(content=self.VALIDATION_SYSTEM_PROMPT),
+            UserMessage(content=task, source="user")
+        ]))
+        return self._extract_grants_from_result(result, keys=keys)
+    
+    async def validate_and_normalize_grant_data(self, raw_grant_data: Dict) -> Optional[Dict]:
+        """Validate and normalize grant data with a direct model call"""
+        task = VALIDATION_TASK.safe_substitute(raw_data=orjson.dumps(raw_grant_data, option=orjson.OPT_INDENT_2).decode())
         
         try:
-            result = await self.team.run_stream(task=task)
-            validated_data = self._extract_grants_from_result(result)
+            validated_data = await self._run_validation(task)
             
             if validated_data:
                 logger.info("Successfully validated and normalized grant data")
@@ -339,8 +617,76 @@ class EnhancedGrantOracleOrchestrator:
             logger.error(f"Error validating grant data: {e}")
             return None
     
-    async def daily_discovery_mission(self, target_urls: Optional[List[str]] = None) -> List[Dict]:
-        """Execute daily grant discovery mission with dynamic URL support"""
+    async def validate_and_normalize_grants_batch(self, raw_grants: List[Dict]) -> List[Optional[Dict]]:
+        """Validate and normalize several grants in one model call
+        
+        Returns one entry per input grant, in the same order; None marks a grant
+        that was rejected or could not be validated.
+        """
+        task = BATCH_VALIDATION_TASK.safe_substitute(
+            count=len(raw_grants),
+            raw_data=orjson.dumps(raw_grants, option=orjson.OPT_INDENT_2).decode()
+        )
+        
+        try:
+            data = await self._run_validation(task, keys=('validated',))
+            validated = data.get('validated') if data else None
+            
+            if isinstance(validated, list) and len(validated) == len(raw_grants):
+                logger.info(f"Validated {sum(1 for g in validated if g)} of {len(raw_grants)} grants")
+                return [grant if isinstance(grant, dict) else None for grant in validated]
+            
+            logger.warning("Batch validation returned a malformed result")
+            return [None] * len(raw_grants)
+            
+        except Exception as e:
+            logger.error(f"Error validating grant batch: {e}")
+            return [None] * len(raw_grants)
+    
+    async def validate_discovered_grants(self, url: str, grants_data: Dict,
+                                         validation_slots: Optional[asyncio.Semaphore] = None) -> List[Dict]:
+        """Validate and normalize the grants discovered on a URL
+        
+        Grants are validated in batches; validation_slots, if given, bounds how
+        many batch calls are in flight.
+        """
+        grants = grants_data.get('grants') or []
+        batches = [grants[i:i + VALIDATION_BATCH_SIZE] for i in range(0, len(grants), VALIDATION_BATCH_SIZE)]
+        
+        async def validate(batch: List[Dict]) -> List[Optional[Dict]]:
+            if validation_slots is None:
+                return await self.validate_and_normalize_grants_batch(batch)
+            async with validation_slots:
+                return await self.validate_and_normalize_grants_batch(batch)
+        
+        results = await asyncio.gather(*(validate(batch) for batch in batches), return_exceptions=True)
+        validated = [grant for batch in results if not isinstance(batch, BaseException) for grant in batch]
+        
+        discovered_at = datetime.now().isoformat()
+        return [
+            {
+                'source_url': url,
+                'grant': normalized_data,
+                'discovered_at': discovered_at,
+                'source_quality': grants_data.get('source_quality', {})
+            }
+            for normalized_data in validated
+            if normalized_data
+        ]
+    
+    async def daily_discovery_mission(self, target_urls: Optional[List[str]] = None,
+                                      max_concurrency: int = 1) -> List[Dict]:
+        """Execute daily grant discovery mission with dynamic URL support
+        
+        max_concurrency workers, each with its own team, take URLs from a
+        queue until it is drained; URLs added while the mission runs join the
+        same queue. Up to max_concurrency grant validation calls are in flight
+        at once.
+        
+        When CELERY_BROKER_URL is set, each URL is instead sent to the Celery
+        workers as its own task (see agents.tasks) and this process only
+        collects the results.
+        """
         logger.info(f"Starting daily grant discovery mission at {datetime.now()}")
         
         # Add new target URLs if provided
@@ -356,31 +702,56 @@ class EnhancedGrantOracleOrchestrator:
         
         logger.info(f"Processing {len(pending_urls)} URLs")
         
-        discovered_grants = []
+        if self.task_broker_url:
+            return await self._dispatch_discovery_tasks(pending_urls)
         
+        workers = max(1, max_concurrency)
+        while len(self.web_teams) < workers:
+            self.web_teams.append(self._build_web_team())
+        validation_slots = asyncio.Semaphore(workers)
+        
+        url_queue: asyncio.Queue = asyncio.Queue()
         for url in pending_urls:
-            logger.info(f"Processing URL: {url}")
+            url_queue.put_nowait(url)
+        discovered_grants: List[Dict] = []
+        sources = 0
+        
+        async def process_url(url: str, team: MagenticOneGroupChat) -> List[Dict]:
+            # Politeness limits apply per host, so different portals are crawled in parallel
+            await self._wait_for_host(urlparse(url).netloc)
             
             # Discover grants from URL
-            grants_data = await self.discover_grants_from_url(url)
+            grants_data = await self.discover_grants_from_url(url, team=team)
+            if not grants_data or not grants_data.get('grants'):
+                return []
             
-            if grants_data and grants_data.get('grants'):
-                # Validate and normalize the data
-                for grant in grants_data['grants']:
-                    normalized_data = await self.validate_and_normalize_grant_data(grant)
-                    
-                    if normalized_data:
-                        discovered_grants.append({
-                            'source_url': url,
-                            'grant': normalized_data,
-                            'discovered_at': datetime.now().isoformat(),
-                            'source_quality': grants_data.get('source_quality', {})
-                        })
-            
-            # Add delay between requests to be respectful
-            await asyncio.sleep(2)
+            return await self.validate_discovered_grants(url, grants_data, validation_slots)
         
-        logger.info(f"Discovery mission completed. Found {len(discovered_grants)} grants from {len(pending_urls)} sources.")
+        async def worker(team: MagenticOneGroupChat) -> None:
+            nonlocal sources
+            while True:
+                url = await url_queue.get()
+                try:
+                    # Skip URLs removed from the targets while they waited
+                    if url in self.pending_urls:
+                        sources += 1
+                        discovered_grants.extend(await process_url(url, team))
+                except Exception as e:
+                    logger.error(f"Error processing URL {url}: {e}")
+                finally:
+                    url_queue.task_done()
+        
+        self._url_queue = url_queue
+        worker_tasks = [asyncio.create_task(worker(team)) for team in self.web_teams[:workers]]
+        try:
+            await url_queue.join()
+        finally:
+            self._url_queue = None
+            for task in worker_tasks:
+                task.cancel()
+            await asyncio.gather(*worker_tasks, return_exceptions=True)
+        
+        logger.info(f"Discovery mission completed. Found {len(discovered_grants)} grants from {sources} sources.")
         
         # Log statistics
         stats = self.get_processing_stats()
@@ -388,6 +759,53 @@ class EnhancedGrantOracleOrchestrator:
         
         return discovered_grants
     
+    async def _dispatch_discovery_tasks(self, urls: List[str]) -> List[Dict]:
+        """Run one Celery task per URL and gather the grants they discover"""
+        from agents.tasks import dispatch_urls
+        
+        results = await asyncio.to_thread(dispatch_urls, urls)
+        discovered_grants = [grant for found in results for grant in found]
+        
+        logger.info(f"Distributed discovery mission completed. Found {len(discovered_grants)} grants from {len(urls)} sources.")
+        return discovered_grants
+    
+    async def _wait_for_host(self, host: str) -> None:
+        """Wait out any pause the host asked for, then take a token from its bucket"""
+        delay = self._host_paused_until.get(host, 0.0) - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self._host_limiter(host).acquire()
+    
+    def _host_limiter(self, host: str) -> AsyncLimiter:
+        limiter = self._host_limiters.get(host)
+        if limiter is None:
+            limiter = self._host_limiters[host] = AsyncLimiter(HOST_BURST, HOST_BURST / HOST_RATE)
+        return limiter
+    
+    def _observe_host_headers(self, host: str, status: int, headers) -> None:
+        """Slow a host down when its responses say we are going too fast
+        
+        A 429/503 halves the host's rate and pauses it for Retry-After (or
+        until X-RateLimit-Reset once X-RateLimit-Remaining hits zero).
+        """
+        pause = None
+        if status in (429, 503):
+            retry_after = headers.get('Retry-After', '')
+            pause = float(retry_after) if retry_after.isdigit() else 60.0
+            limiter = self._host_limiter(host)
+            rate = max(HOST_MIN_RATE, limiter.max_rate / limiter.time_period / 2)
+            self._host_limiters[host] = AsyncLimiter(HOST_BURST, HOST_BURST / rate)
+            logger.warning(f"{host} is throttling us, slowing to {rate * 60:.1f} runs/min")
+        elif headers.get('X-RateLimit-Remaining') == '0':
+            reset = headers.get('X-RateLimit-Reset', '')
+            if reset.isdigit():
+                # Either seconds to wait or, for large values, an epoch timestamp
+                pause = float(reset) if int(reset) < 1e9 else float(reset) - time.time()
+        
+        if pause:
+            until = asyncio.get_running_loop().time() + pause
+            self._host_paused_until[host] = max(self._host_paused_until.get(host, 0.0), until)
+    
     def get_url_feedback(self, url: str) -> Optional[Dict]:
         """Get feedback for a specific URL"""
         return self.url_feedback.get(url)
@@ -400,12 +818,16 @@ class EnhancedGrantOracleOrchestrator:
         """Reset the processing status of a URL"""
         self.processed_urls.discard(url)
         self.failed_urls.discard(url)
-        if url in self.url_feedback:
-            del self.url_feedback[url]
+        if url in self.target_urls:
+            self.pending_urls.add(url)
+        self.url_feedback.pop(url)
         logger.info(f"Reset status for URL: {url}")
     
-    def _extract_grants_from_result(self, result) -> Optional[Dict]:
-        """Extract grant data from agent result"""
+    def _extract_grants_from_result(self, result, keys=('grants', 'grant')) -> Optional[Dict]:
+        """Extract grant data from agent result
+        
+        Returns the first JSON object in the transcript containing one of keys.
+        """
         if not result:
             return None
         
@@ -421,18 +843,32 @@ class EnhancedGrantOracleOrchestrator:
             else:
                 content = str(result)
             
-            # Look for JSON in the content
-            import re
-            json_pattern = r'\{.*\}'
-            json_matches = re.findall(json_pattern, content, re.DOTALL)
-            
-            for json_str in json_matches:
+            # A reply that is a bare JSON object (the usual validation answer)
+            # parses in one orjson call
+            stripped = content.strip()
+            if stripped.startswith('{'):
                 try:
-                    data = json.loads(json_str)
-                    if 'grants' in data or 'grant' in data:
+                    data = orjson.loads(stripped)
+                except orjson.JSONDecodeError:
+                    pass
+                else:
+                    if isinstance(data, dict) and any(key in data for key in keys):
                         return data
+            
+            # Otherwise decode each JSON object in place, left to right; a '{' that does not
+            # start valid JSON is skipped, and a decoded object is jumped over whole
+            decoder = json.JSONDecoder()
+            position = content.find('{')
+            while position != -1:
+                try:
+                    data, end = decoder.raw_decode(content, position)
                 except json.JSONDecodeError:
+                    position = content.find('{', position + 1)
                     continue
+                
+                if isinstance(data, dict) and any(key in data for key in keys):
+                    return data
+                position = content.find('{', end)
             
             return None
             
@@ -450,6 +886,13 @@ class EnhancedGrantOracleOrchestrator:
     
     async def close(self):
         """Clean up resources"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        await self.response_cache.close()
+        if self._url_state_redis is not None:
+            self._url_state_redis.close()
+        if self.cheap_client is not self.model_client:
+            await self.cheap_client.close()
         await self.model_client.close()
 
 # Example usage and testing
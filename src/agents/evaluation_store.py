@@ -0,0 +1,85 @@
+"""
+Source Evaluation Store
+Keeps source evaluations in SQLite so restarts do not pay for the same agent runs again
+"""
+
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Evaluations older than this are redone
+DEFAULT_TTL_SECONDS = 7 * 86400
+
+
+class EvaluationStore:
+    """
+    Source evaluations keyed by (URL, model)
+
+    Keying on the model means switching models re-evaluates every source.
+    Storage errors are logged and treated as misses, so a broken or read-only
+    cache file costs agent runs but never fails an evaluation.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+        try:
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                "url TEXT NOT NULL, model TEXT NOT NULL, stored_at REAL NOT NULL, "
+                "evaluation BLOB NOT NULL, PRIMARY KEY (url, model))"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Evaluation store unavailable at {path}, evaluating without it: {e}")
+            self._db = None
+
+    def get(self, url: str, model: str) -> Optional[Dict[str, Any]]:
+        """A stored evaluation younger than the TTL, counting the hit or miss"""
+        row = None
+        if self._db is not None:
+            try:
+                row = self._db.execute(
+                    "SELECT evaluation FROM evaluations WHERE url = ? AND model = ? AND stored_at > ?",
+                    (url, model, time.time() - self.ttl_seconds)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Evaluation store read failed: {e}")
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(row[0])
+
+    def set(self, url: str, model: str, evaluation: Dict[str, Any]) -> None:
+        """Store an evaluation, replacing any older one for the same key"""
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO evaluations (url, model, stored_at, evaluation) VALUES (?, ?, ?, ?)",
+                (url, model, time.time(), orjson.dumps(evaluation))
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Evaluation store write failed: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit and miss counters since startup"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Close the database connection"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
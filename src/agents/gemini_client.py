@@ -4,18 +4,26 @@ Direct Gemini client for autogen framework
 """
 
 import asyncio
+import functools
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncGenerator, Dict, Any, Optional
 import google.generativeai as genai
 class GeminiChatCompletionClient:
     """Direct Gemini client for autogen framework"""
     
-    def __init__(self, model="gemini-2.0-flash-exp", api_key=None, timeout=60.0):
+    def __init__(self, model="gemini-2.0-flash-exp", api_key=None, timeout=60.0, max_workers=64):
         self.model_name = model
         self.api_key = api_key
         self.timeout = timeout
         self._configured = False
+        self._model = None
+        self._model_built_for = None
+        
+        # generate_content blocks, so calls run on this client's own threads
+        # rather than queuing behind everything else on the default executor
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
         
         # Add model_info attribute that autogen expects
         self.model_info = {
@@ -34,6 +42,7 @@ class GeminiChatCompletionClient:
         """Configure Gemini client"""
         try:
             genai.configure(api_key=self.api_key)
+            self._get_model()
             self._configured = True
             print(f"✅ Gemini client configured with model: {self.model_name}")
         except Exception as e:
@@ -49,16 +58,16 @@ class GeminiChatCompletionClient:
             # Convert autogen messages to Gemini format
             gemini_messages = self._convert_messages(messages)
             
-            # Create Gemini model
-            model = genai.GenerativeModel(self.model_name)
-            
             # Generate content
-            response = await asyncio.to_thread(
-                model.generate_content,
-                gemini_messages,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=kwargs.get('temperature', 0.7),
-                    max_output_tokens=kwargs.get('max_tokens', 4096),
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                functools.partial(
+                    self._get_model().generate_content,
+                    gemini_messages,
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=kwargs.get('temperature', 0.7),
+                        max_output_tokens=kwargs.get('max_tokens', 4096),
+                    )
                 )
             )
             
@@ -69,6 +78,13 @@ class GeminiChatCompletionClient:
             print(f"❌ Gemini API error: {e}")
             raise
     
+    def _get_model(self):
+        """Gemini model built once, rebuilt only if model_name was changed"""
+        if self._model is None or self._model_built_for != self.model_name:
+            self._model = genai.GenerativeModel(self.model_name)
+            self._model_built_for = self.model_name
+        return self._model
+    
     def _convert_messages(self, messages):
         """Convert autogen messages to Gemini format"""
         gemini_messages = []
@@ -118,8 +134,8 @@ class GeminiChatCompletionClient:
     
     async def close(self):
         """Close the client"""
-        # Gemini client doesn't need explicit closing
-        pass
+        # Gemini itself needs no closing; only the worker threads are released
+        self._executor.shutdown(wait=False)
     
     def get_model_info(self):
         """Get model information"""
@@ -8,23 +8,139 @@ import os
 import re
 import json
 from datetime import datetime, timedelta
+from string import Template
 from typing import List, Dict, Set, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
 
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from autogen_ext.teams.magentic_one import MagenticOne
 from autogen_ext.agents.web_surfer import MultimodalWebSurfer
 from autogen_ext.agents.file_surfer import FileSurfer
 from autogen_ext.agents.magentic_one import MagenticOneCoderAgent
 from autogen_agentchat.agents import CodeExecutorAgent
+from autogen_agentchat.base import TaskResult
 from autogen_ext.code_executors.local import LocalCommandLineCodeExecutor
 from autogen_agentchat.teams import MagenticOneGroupChat
+from autogen_core.models import SystemMessage, UserMessage
+
+from agents.evaluation_store import EvaluationStore
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+
+# Answer format for the URL-finding tasks, read by _extract_urls_from_content
+URL_ANSWER_FORMAT = 'Return ONLY JSON of the form {"urls": [{"url": "...", "category": "..."}]}.'
+
+# Scores saturate after a few KB of evidence, so only this much of an
+# evaluation transcript is kept
+MAX_EVALUATION_CONTENT = 64 * 1024
+
+SCORING_SYSTEM_PROMPT = """You rate websites as sources of grant and funding information for Indian startups.
+        
+        Respond with JSON only."""
+
+BATCH_SCORING_TASK = Template("""
+        Today is $today. Below are agent analyses of $count websites.
+        Rate each website between 0 and 1 on:
+        - relevance: does it publish grant or funding information for startups?
+        - credibility: is it a legitimate organization?
+        - timeliness: is the information current and updated?
+        
+        Return JSON of the form
+        {"scores": [{"url": ..., "relevance": ..., "credibility": ..., "timeliness": ...}]}
+        with one entry per website.
+        
+        Websites: $sources
+        """)
+
+# Sources scored per model call
+SCORING_BATCH_SIZE = 10
+
+# The agent's conclusions close its transcript; this much of the end is scored
+SCORING_EXCERPT_CHARS = 4000
+
+# Politeness budget per host: agent runs per second and how many may start back to back
+HOST_RATE = 0.5
+HOST_BURST = 2
+
+# Pre-filter before agent evaluation: the first PREFILTER_BYTES of each page are
+# keyword-scored and pages at or below PREFILTER_MIN_RELEVANCE are not evaluated
+PREFILTER_BYTES = 64 * 1024
+PREFILTER_MIN_RELEVANCE = 0.2
+PREFILTER_CONCURRENCY = 50
+
+@dataclass(slots=True, frozen=True)
+class UrlInfo:
+    """A URL with the parts the filters and scorers read, parsed once"""
+    raw: str
+    lower: str
+    netloc: str
+    scheme: str
+
+@lru_cache(maxsize=4096)
+def make_urlinfo(url: str) -> UrlInfo:
+    """
+    Parse and lowercase a URL
+
+    Memoized per distinct URL, so a URL seen by extraction, filtering and
+    scoring is parsed a single time.
+    """
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        # e.g. a malformed IPv6 host; treated as invalid
+        return UrlInfo(url, url.lower(), '', '')
+    return UrlInfo(url, url.lower(), parsed.netloc, parsed.scheme)
+
+class KeywordMatcher:
+    """Counts, per category, how many of the category's keywords occur in a text
+    
+    With pyahocorasick installed the text is scanned once for every keyword of
+    every category; otherwise each keyword is a substring test.
+    """
+    
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.categories = {category: tuple(keywords) for category, keywords in categories.items()}
+        self._keyword_categories: Dict[str, List[str]] = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword, []).append(category)
+        
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._keyword_categories:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+    
+    def count(self, text: str) -> Dict[str, int]:
+        if self._automaton is None:
+            return {
+                category: sum(1 for keyword in keywords if keyword in text)
+                for category, keywords in self.categories.items()
+            }
+        
+        counts = dict.fromkeys(self.categories, 0)
+        for keyword in {keyword for _, keyword in self._automaton.iter(text)}:
+            for category in self._keyword_categories[keyword]:
+                counts[category] += 1
+        return counts
+
 class SourceEvaluator:
     """Evaluates and scores potential grant sources"""
     
@@ -47,73 +163,95 @@ class SourceEvaluator:
             'scam', 'fraud', 'fake', 'spam', 'advertisement', 'ad',
             'casino', 'gambling', 'loan shark', 'quick money'
         ]
-    
-    def calculate_relevance_score(self, content: str, url: str) -> float:
-        """Calculate relevance score based on content analysis"""
-        content_lower = content.lower()
-        url_lower = url.lower()
         
-        # Count grant-related keywords
-        grant_score = sum(1 for keyword in self.grant_keywords if keyword in content_lower)
+        self.recent_patterns = ['2024', '2025', 'latest', 'new', 'recent', 'updated']
         
+        self._matcher: Optional[KeywordMatcher] = None
+        self._matcher_year: Optional[int] = None
+    
+    def _keyword_counts(self, content_lower: str) -> Dict[str, int]:
+        """Keyword counts for every scoring category, from one scan of the content"""
+        current_year = datetime.now().year
+        if self._matcher_year != current_year:
+            # "Recent" years move with the calendar
+            self._matcher = KeywordMatcher({
+                'grant': self.grant_keywords,
+                'credibility': self.credibility_indicators,
+                'negative': self.negative_indicators,
+                'recent': self.recent_patterns,
+                'year': [str(year) for year in range(current_year - 1, current_year + 2)]
+            })
+            self._matcher_year = current_year
+        return self._matcher.count(content_lower)
+    
+    def _relevance(self, counts: Dict[str, int], url_lower: str) -> float:
         # Bonus for government domains
         gov_bonus = 2 if any(domain in url_lower for domain in ['.gov.', '.nic.', '.org']) else 0
         
-        # Penalty for negative indicators
-        negative_penalty = sum(1 for indicator in self.negative_indicators if indicator in content_lower)
-        
-        # Calculate final score (0-1 range)
-        raw_score = (grant_score + gov_bonus - negative_penalty) / 10
+        # Grant-related keywords, with a penalty for negative indicators (0-1 range)
+        raw_score = (counts['grant'] + gov_bonus - counts['negative']) / 10
         return max(0, min(1, raw_score))
     
-    def calculate_credibility_score(self, content: str, url: str) -> float:
-        """Calculate credibility score based on website structure and content"""
-        content_lower = content.lower()
-        
-        # Check for credibility indicators
-        credibility_score = sum(1 for indicator in self.credibility_indicators if indicator in content_lower)
-        
+    def _credibility(self, counts: Dict[str, int], domain: str) -> float:
         # Check for professional domain
-        domain = urlparse(url).netloc
         professional_bonus = 1 if any(ext in domain for ext in ['.gov', '.org', '.edu', '.in']) else 0
         
         # Calculate final score (0-1 range)
-        raw_score = (credibility_score + professional_bonus) / 8
+        raw_score = (counts['credibility'] + professional_bonus) / 8
+        return max(0, min(1, raw_score))
+    
+    def _timeliness(self, counts: Dict[str, int]) -> float:
+        # Recent years plus recent date patterns (0-1 range)
+        raw_score = (counts['year'] + counts['recent']) / 6
         return max(0, min(1, raw_score))
     
+    def score_all(self, content: str, url: str) -> Tuple[float, float, float]:
+        """Relevance, credibility and timeliness scores from a single content scan"""
+        counts = self._keyword_counts(content.lower())
+        info = make_urlinfo(url)
+        return (
+            self._relevance(counts, info.lower),
+            self._credibility(counts, info.netloc),
+            self._timeliness(counts)
+        )
+    
+    def calculate_relevance_score(self, content: str, url: str) -> float:
+        """Calculate relevance score based on content analysis"""
+        return self._relevance(self._keyword_counts(content.lower()), make_urlinfo(url).lower)
+    
+    def calculate_credibility_score(self, content: str, url: str) -> float:
+        """Calculate credibility score based on website structure and content"""
+        return self._credibility(self._keyword_counts(content.lower()), make_urlinfo(url).netloc)
+    
     def calculate_timeliness_score(self, content: str) -> float:
         """Calculate timeliness score based on recent updates"""
-        current_year = datetime.now().year
-        content_lower = content.lower()
-        
-        # Look for recent years in content
-        recent_years = [str(year) for year in range(current_year - 1, current_year + 2)]
-        year_mentions = sum(1 for year in recent_years if year in content)
-        
-        # Look for recent date patterns
-        recent_patterns = ['2024', '2025', 'latest', 'new', 'recent', 'updated']
-        pattern_score = sum(1 for pattern in recent_patterns if pattern in content_lower)
-        
-        # Calculate final score (0-1 range)
-        raw_score = (year_mentions + pattern_score) / 6
-        return max(0, min(1, raw_score))
+        return self._timeliness(self._keyword_counts(content.lower()))
 
 class IntelligentSourceDiscoveryModule:
     """Main class for intelligent source discovery using Magentic-One"""
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(self, openai_api_key: Optional[str] = None, max_concurrency: int = 3,
+                 cache_path: Optional[str] = None):
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         if not self.openai_api_key:
             raise ValueError("OpenAI API key is required")
         
+        self.model_name = "gpt-4o-mini"
         self.model_client = OpenAIChatCompletionClient(
-            model="gpt-4o-mini",
+            model=self.model_name,
             api_key=self.openai_api_key
         )
         
+        # Agent runs in flight at once; each needs its own team
+        self.max_concurrency = max(1, max_concurrency)
+        
         self.evaluator = SourceEvaluator()
         self.discovered_sources: Set[str] = set()
         self.evaluated_sources: Dict[str, Dict] = {}
+        # Evaluations survive restarts, so reruns skip the agent runs
+        self.evaluation_store = EvaluationStore(
+            cache_path or os.getenv('ISDM_CACHE_PATH', 'isdm_cache.sqlite3')
+        )
         
         # Initialize seed URLs
         self.seed_urls = [
@@ -133,90 +271,136 @@ class IntelligentSourceDiscoveryModule:
     
     def setup_agents(self):
         """Setup Magentic-One agents for source discovery"""
+        self.team = self._build_team()
+        
+        # Idle teams for concurrent agent runs (a team runs one task at a time)
+        self._idle_teams: List[MagenticOneGroupChat] = [self.team]
+        self._team_slots = asyncio.Semaphore(self.max_concurrency)
+        
+        # Token bucket per visited host, so busy hosts do not hold up the others
+        self._host_limiters: Dict[str, AsyncLimiter] = {}
+    
+    def _build_team(self) -> MagenticOneGroupChat:
+        """Build a Magentic-One team sharing this module's model client"""
         
         # Web Surfer for browsing and discovery
-        self.web_surfer = MultimodalWebSurfer(
+        web_surfer = MultimodalWebSurfer(
             "SourceDiscoveryAgent",
             model_client=self.model_client,
             description="Specialized agent for discovering and evaluating potential grant sources"
         )
         
         # File Surfer for document analysis
-        self.file_surfer = FileSurfer(
+        file_surfer = FileSurfer(
             "DocumentAnalyzer", 
             model_client=self.model_client,
             description="Agent for analyzing documents and extracting source information"
         )
         
         # Coder for data processing and scoring
-        self.coder = MagenticOneCoderAgent(
+        coder = MagenticOneCoderAgent(
             "SourceEvaluator",
             model_client=self.model_client,
             description="Agent for evaluating and scoring potential grant sources"
         )
         
         # Terminal for executing commands
-        self.terminal = CodeExecutorAgent(
+        terminal = CodeExecutorAgent(
             "ComputerTerminal",
             code_executor=LocalCommandLineCodeExecutor(),
             description="Agent for executing system commands and scripts"
         )
         
         # Create the Magentic-One team
-        self.team = MagenticOneGroupChat(
-            [self.web_surfer, self.file_surfer, self.coder, self.terminal],
+        return MagenticOneGroupChat(
+            [web_surfer, file_surfer, coder, terminal],
             model_client=self.model_client
         )
     
+    async def _run_team_task(self, task: str, url: Optional[str] = None):
+        """Run a task on an idle team, with at most max_concurrency runs in flight
+        
+        Returns the TaskResult that closes the run's stream, or None if the
+        stream ended without one. A task that visits url first waits for a
+        token from that host's bucket.
+        """
+        if url is not None:
+            await self._host_limiter(make_urlinfo(url).netloc).acquire()
+        
+        async with self._team_slots:
+            team = self._idle_teams.pop() if self._idle_teams else self._build_team()
+            result = None
+            try:
+                async for message in team.run_stream(task=task):
+                    if isinstance(message, TaskResult):
+                        result = message
+                return result
+            finally:
+                # Pooled teams serve unrelated tasks; clear this conversation first
+                try:
+                    await team.reset()
+                except Exception as e:
+                    logger.debug(f"Team reset failed: {e}")
+                self._idle_teams.append(team)
+    
+    def _host_limiter(self, host: str) -> AsyncLimiter:
+        limiter = self._host_limiters.get(host)
+        if limiter is None:
+            limiter = self._host_limiters[host] = AsyncLimiter(HOST_BURST, HOST_BURST / HOST_RATE)
+        return limiter
+    
+    def _urls_from_result(self, result) -> List[str]:
+        """URLs mentioned in the messages of an agent result"""
+        urls = []
+        if result and hasattr(result, 'messages'):
+            for message in result.messages:
+                if isinstance(getattr(message, 'content', None), str):
+                    urls.extend(self._extract_urls_from_content(message.content))
+        return urls
+    
     async def discover_from_seed_expansion(self, max_depth: int = 2) -> List[str]:
         """Discover new sources by expanding from seed URLs"""
         logger.info(f"Starting seed URL expansion with max depth {max_depth}")
         
-        discovered_urls = []
-        
-        for seed_url in self.seed_urls:
-            try:
-                task = f"""
-                Visit the URL: {seed_url}
-                
-                Your task is to find links to other websites that might contain grant or funding information for Indian startups.
-                
-                Look for:
-                1. Links to government departments and ministries
-                2. Links to startup ecosystem organizations
-                3. Links to funding agencies and corporations
-                4. Links to state government startup portals
-                5. Links to incubators and accelerators
-                
-                Extract all relevant URLs and categorize them by type.
-                Focus on Indian organizations and government entities.
-                
-                Return the results as a JSON list of URLs with their categories.
-                """
-                
-                result = await self.team.run_stream(task=task)
-                
-                # Parse the result to extract URLs
-                if result and hasattr(result, 'messages'):
-                    for message in result.messages:
-                        if hasattr(message, 'content'):
-                            urls = self._extract_urls_from_content(message.content)
-                            discovered_urls.extend(urls)
-                
-                # Add delay between requests
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error processing seed URL {seed_url}: {e}")
-                continue
+        # Seeds are expanded concurrently; one failing seed does not stop the others
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._expand_seed(seed_url)) for seed_url in self.seed_urls]
+        discovered_urls = [url for task in tasks for url in task.result()]
         
-        # Remove duplicates and filter
-        unique_urls = list(set(discovered_urls))
-        filtered_urls = self._filter_relevant_urls(unique_urls)
+        # Drop URLs seen before (in discovery order) and irrelevant ones
+        filtered_urls = self._filter_relevant_urls(discovered_urls)
         
         logger.info(f"Discovered {len(filtered_urls)} potential sources from seed expansion")
         return filtered_urls
     
+    async def _expand_seed(self, seed_url: str) -> List[str]:
+        """Ask an agent for promising links reachable from one seed URL"""
+        try:
+            task = f"""
+            Visit the URL: {seed_url}
+            
+            Your task is to find links to other websites that might contain grant or funding information for Indian startups.
+            
+            Look for:
+            1. Links to government departments and ministries
+            2. Links to startup ecosystem organizations
+            3. Links to funding agencies and corporations
+            4. Links to state government startup portals
+            5. Links to incubators and accelerators
+            
+            Extract all relevant URLs and categorize them by type.
+            Focus on Indian organizations and government entities.
+            
+            {URL_ANSWER_FORMAT}
+            """
+            
+            result = await self._run_team_task(task, url=seed_url)
+            return self._urls_from_result(result)
+            
+        except Exception as e:
+            logger.error(f"Error processing seed URL {seed_url}: {e}")
+            return []
+    
     async def discover_from_search(self) -> List[str]:
         """Discover new sources through targeted web searches"""
         logger.info("Starting search-based discovery")
@@ -234,56 +418,91 @@ class IntelligentSourceDiscoveryModule:
             "agritech startup grants India"
         ]
         
-        discovered_urls = []
+        # Searches run concurrently; one failing query does not stop the others
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._search(query)) for query in search_queries]
+        discovered_urls = [url for task in tasks for url in task.result()]
         
-        for query in search_queries:
-            try:
-                task = f"""
-                Perform a web search for: "{query}"
-                
-                Analyze the search results and identify websites that might contain grant or funding information.
-                
-                Look for:
-                1. Government websites (.gov.in, .nic.in)
-                2. Official startup portals
-                3. Corporate websites with CSR sections
-                4. NGO and foundation websites
-                5. News articles about new grant announcements
-                
-                Visit the top 5-10 most promising results and extract their URLs.
-                Evaluate each website briefly for relevance to startup grants.
-                
-                Return a JSON list of URLs with brief descriptions of why they might be relevant.
-                """
-                
-                result = await self.team.run_stream(task=task)
-                
-                # Parse the result to extract URLs
-                if result and hasattr(result, 'messages'):
-                    for message in result.messages:
-                        if hasattr(message, 'content'):
-                            urls = self._extract_urls_from_content(message.content)
-                            discovered_urls.extend(urls)
-                
-                # Add delay between searches
-                await asyncio.sleep(3)
-                
-            except Exception as e:
-                logger.error(f"Error processing search query '{query}': {e}")
-                continue
-        
-        # Remove duplicates and filter
-        unique_urls = list(set(discovered_urls))
-        filtered_urls = self._filter_relevant_urls(unique_urls)
+        # Drop URLs seen before (in discovery order) and irrelevant ones
+        filtered_urls = self._filter_relevant_urls(discovered_urls)
         
         logger.info(f"Discovered {len(filtered_urls)} potential sources from search")
         return filtered_urls
     
+    async def _search(self, query: str) -> List[str]:
+        """Ask an agent for promising sites found by one web search"""
+        try:
+            task = f"""
+            Perform a web search for: "{query}"
+            
+            Analyze the search results and identify websites that might contain grant or funding information.
+            
+            Look for:
+            1. Government websites (.gov.in, .nic.in)
+            2. Official startup portals
+            3. Corporate websites with CSR sections
+            4. NGO and foundation websites
+            5. News articles about new grant announcements
+            
+            Visit the top 5-10 most promising results and extract their URLs.
+            Evaluate each website briefly for relevance to startup grants.
+            
+            {URL_ANSWER_FORMAT}
+            Use the category to say briefly why the site might be relevant.
+            """
+            
+            result = await self._run_team_task(task)
+            return self._urls_from_result(result)
+            
+        except Exception as e:
+            logger.error(f"Error processing search query '{query}': {e}")
+            return []
+    
     async def evaluate_source(self, url: str) -> Optional[Dict]:
         """Evaluate a potential source and calculate its score"""
+        return (await self.evaluate_sources([url]))[0]
+    
+    async def evaluate_sources(self, urls: List[str]) -> List[Optional[Dict]]:
+        """Evaluate potential sources, one agent analysis each, scored in batches
+        
+        Returns one evaluation per URL, in order; None marks a failed evaluation.
+        """
+        evaluations: Dict[str, Optional[Dict]] = {}
+        pending: List[str] = []
+        for url in urls:
+            if url in evaluations or url in pending:
+                continue
+            cached = self._cached_evaluation(url)
+            if cached is not None:
+                evaluations[url] = cached
+            else:
+                pending.append(url)
+        
+        # Analyses run concurrently, bounded by the team pool
+        analyses = await asyncio.gather(*(self._analyze_source(url) for url in pending))
+        analyzed = [(url, content) for url, content in zip(pending, analyses) if content is not None]
+        
+        scores = await self.score_batch(analyzed)
+        for (url, content), source_scores in zip(analyzed, scores):
+            evaluation = self._build_evaluation(url, content, source_scores)
+            self.evaluated_sources[url] = evaluation
+            self.evaluation_store.set(url, self.model_name, evaluation)
+            evaluations[url] = evaluation
+        
+        return [evaluations.get(url) for url in urls]
+    
+    def _cached_evaluation(self, url: str) -> Optional[Dict]:
+        """An evaluation from this run or the persistent store"""
         if url in self.evaluated_sources:
             return self.evaluated_sources[url]
         
+        stored = self.evaluation_store.get(url, self.model_name)
+        if stored is not None:
+            self.evaluated_sources[url] = stored
+        return stored
+    
+    async def _analyze_source(self, url: str) -> Optional[str]:
+        """Have an agent browse and analyze a source; returns the transcript text"""
         try:
             task = f"""
             Visit and thoroughly analyze the website: {url}
@@ -310,45 +529,97 @@ class IntelligentSourceDiscoveryModule:
             - Target beneficiaries
             - Application process
             - Overall assessment of usefulness
-            
-            Rate the source on a scale of 1-10 for grant discovery potential.
             """
             
-            result = await self.team.run_stream(task=task)
-            
-            # Extract content for scoring
-            content = ""
-            if result and hasattr(result, 'messages'):
-                for message in result.messages:
-                    if hasattr(message, 'content'):
-                        content += message.content + " "
-            
-            # Calculate scores
-            relevance_score = self.evaluator.calculate_relevance_score(content, url)
-            credibility_score = self.evaluator.calculate_credibility_score(content, url)
-            timeliness_score = self.evaluator.calculate_timeliness_score(content)
-            
-            # Calculate overall score
-            overall_score = (relevance_score * 0.4 + credibility_score * 0.4 + timeliness_score * 0.2)
-            
-            evaluation = {
-                'url': url,
-                'relevance_score': relevance_score,
-                'credibility_score': credibility_score,
-                'timeliness_score': timeliness_score,
-                'overall_score': overall_score,
-                'content_summary': content[:500],  # First 500 chars
-                'evaluated_at': datetime.now().isoformat(),
-                'agent_analysis': content
-            }
-            
-            self.evaluated_sources[url] = evaluation
-            return evaluation
+            result = await self._run_team_task(task, url=url)
+            return self._transcript_text(result)
             
         except Exception as e:
             logger.error(f"Error evaluating source {url}: {e}")
             return None
     
+    async def score_batch(self, sources: List[Tuple[str, str]]) -> List[Dict]:
+        """Score (url, analysis) pairs with one model call per SCORING_BATCH_SIZE sources
+        
+        Returns relevance, credibility and timeliness scores per source, in order.
+        A source the model did not score falls back to keyword scores.
+        """
+        batches = [sources[i:i + SCORING_BATCH_SIZE] for i in range(0, len(sources), SCORING_BATCH_SIZE)]
+        results = await asyncio.gather(*(self._score_chunk(batch) for batch in batches))
+        return [source_scores for batch_scores in results for source_scores in batch_scores]
+    
+    async def _score_chunk(self, sources: List[Tuple[str, str]]) -> List[Dict]:
+        """Score up to SCORING_BATCH_SIZE sources in one model call"""
+        task = BATCH_SCORING_TASK.safe_substitute(
+            today=datetime.now().date().isoformat(),
+            count=len(sources),
+            sources=json.dumps(
+                [{'url': url, 'analysis': content[-SCORING_EXCERPT_CHARS:]} for url, content in sources],
+                indent=2
+            )
+        )
+        
+        model_scores: Dict[str, Dict] = {}
+        try:
+            result = await self.model_client.create([
+                SystemMessage(content=SCORING_SYSTEM_PROMPT),
+                UserMessage(content=task, source="user")
+            ])
+            model_scores = self._parse_scores(result.content)
+        except Exception as e:
+            logger.error(f"Batch scoring failed, using keyword scores: {e}")
+        
+        return [model_scores.get(url) or self._keyword_scores(content, url) for url, content in sources]
+    
+    def _parse_scores(self, reply) -> Dict[str, Dict]:
+        """Per-URL scores from a scoring reply; malformed entries are left out"""
+        if not isinstance(reply, str):
+            return {}
+        start, end = reply.find('{'), reply.rfind('}')
+        if start == -1 or end < start:
+            return {}
+        try:
+            data = json.loads(reply[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        
+        entries = data.get('scores') if isinstance(data, dict) else None
+        scores = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                scores[entry['url']] = {
+                    'relevance_score': max(0.0, min(1.0, float(entry['relevance']))),
+                    'credibility_score': max(0.0, min(1.0, float(entry['credibility']))),
+                    'timeliness_score': max(0.0, min(1.0, float(entry['timeliness']))),
+                    'scored_by': 'model'
+                }
+            except (KeyError, TypeError, ValueError):
+                continue
+        return scores
+    
+    def _keyword_scores(self, content: str, url: str) -> Dict:
+        relevance_score, credibility_score, timeliness_score = self.evaluator.score_all(content, url)
+        return {
+            'relevance_score': relevance_score,
+            'credibility_score': credibility_score,
+            'timeliness_score': timeliness_score,
+            'scored_by': 'keywords'
+        }
+    
+    def _build_evaluation(self, url: str, content: str, scores: Dict) -> Dict:
+        # Calculate overall score
+        overall_score = (scores['relevance_score'] * 0.4 + scores['credibility_score'] * 0.4 +
+                         scores['timeliness_score'] * 0.2)
+        
+        return {
+            'url': url,
+            **scores,
+            'overall_score': overall_score,
+            'content_summary': content[:500],  # First 500 chars
+            'evaluated_at': datetime.now().isoformat(),
+            'agent_analysis': content
+        }
+    
     async def run_discovery_mission(self, max_new_sources: int = 20) -> List[Dict]:
         """Run a complete discovery mission"""
         logger.info("Starting intelligent source discovery mission")
@@ -359,19 +630,19 @@ class IntelligentSourceDiscoveryModule:
         # Step 2: Discover from search
         search_urls = await self.discover_from_search()
         
-        # Combine and deduplicate
-        all_discovered = list(set(seed_urls + search_urls))
+        # Both lists were deduplicated against discovered_sources, so they are disjoint
+        all_discovered = seed_urls + search_urls
         logger.info(f"Total discovered URLs: {len(all_discovered)}")
         
-        # Step 3: Evaluate sources
-        evaluated_sources = []
-        for url in all_discovered[:max_new_sources]:  # Limit to prevent overload
-            evaluation = await self.evaluate_source(url)
-            if evaluation and evaluation['overall_score'] > 0.3:  # Minimum threshold
-                evaluated_sources.append(evaluation)
-            
-            # Add delay between evaluations
-            await asyncio.sleep(1)
+        # Step 3: Drop dead and off-topic pages with a plain fetch, before any agent run
+        candidates = await self._prefilter(all_discovered)
+        
+        # Step 4: Evaluate sources (analyses run concurrently, scoring is batched)
+        evaluations = await self.evaluate_sources(candidates[:max_new_sources])  # Limit to prevent overload
+        evaluated_sources = [
+            evaluation for evaluation in evaluations
+            if evaluation is not None and evaluation['overall_score'] > 0.3  # Minimum threshold
+        ]
         
         # Sort by overall score
         evaluated_sources.sort(key=lambda x: x['overall_score'], reverse=True)
@@ -379,10 +650,62 @@ class IntelligentSourceDiscoveryModule:
         logger.info(f"Evaluated {len(evaluated_sources)} high-quality sources")
         return evaluated_sources
     
+    async def _prefilter(self, urls: List[str]) -> List[str]:
+        """URLs whose page answers and scores as relevant on its first bytes, in order"""
+        if not urls:
+            return []
+        
+        connector = aiohttp.TCPConnector(limit=PREFILTER_CONCURRENCY, limit_per_host=4)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={'User-Agent': 'India Grants Oracle Bot 1.0'}
+        ) as session:
+            relevant = await asyncio.gather(*(self._page_looks_relevant(session, url) for url in urls))
+        
+        kept = [url for url, keep in zip(urls, relevant) if keep]
+        logger.info(f"Pre-filter kept {len(kept)} of {len(urls)} discovered URLs")
+        return kept
+    
+    async def _page_looks_relevant(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """Keyword relevance of the start of a page's HTML, without an agent"""
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return False
+                html = await response.content.read(PREFILTER_BYTES)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.debug(f"Pre-filter could not fetch {url}: {e}")
+            return False
+        
+        relevance_score, _, _ = self.evaluator.score_all(html.decode('utf-8', 'ignore'), url)
+        return relevance_score > PREFILTER_MIN_RELEVANCE
+    
+    def _transcript_text(self, result) -> str:
+        """Text of a team run's messages, capped at MAX_EVALUATION_CONTENT characters"""
+        parts = []
+        total = 0
+        if result and hasattr(result, 'messages'):
+            for message in result.messages:
+                text = getattr(message, 'content', None)
+                if not isinstance(text, str):
+                    continue
+                if total + len(text) > MAX_EVALUATION_CONTENT:
+                    parts.append(text[:MAX_EVALUATION_CONTENT - total])
+                    break
+                parts.append(text)
+                total += len(text)
+        return " ".join(parts)
+    
     def _extract_urls_from_content(self, content: str) -> List[str]:
-        """Extract URLs from text content"""
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        urls = re.findall(url_pattern, content)
+        """Extract URLs from text content
+        
+        A structured URL_ANSWER_FORMAT reply is read directly; any other text
+        is scanned for URLs.
+        """
+        urls = self._urls_from_json(content)
+        if urls is None:
+            urls = URL_PATTERN.findall(content)
         
         # Clean and validate URLs
         cleaned_urls = []
@@ -396,24 +719,51 @@ class IntelligentSourceDiscoveryModule:
         
         return cleaned_urls
     
+    def _urls_from_json(self, content: str) -> Optional[List[str]]:
+        """URLs of a {"urls": [...]} reply, or None if content is not one"""
+        stripped = content.strip()
+        if stripped.startswith('```'):
+            # Drop a Markdown code fence around the JSON
+            stripped = stripped.strip('`').removeprefix('json').strip()
+        if not stripped.startswith('{'):
+            return None
+        
+        try:
+            data = orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            return None
+        entries = data.get('urls') if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            return None
+        
+        urls = []
+        for entry in entries:
+            url = entry.get('url') if isinstance(entry, dict) else entry
+            if isinstance(url, str):
+                urls.append(url.strip())
+        return urls
+    
     def _is_valid_url(self, url: str) -> bool:
         """Basic URL validation"""
-        try:
-            parsed = urlparse(url)
-            return bool(parsed.netloc) and bool(parsed.scheme)
-        except:
-            return False
+        info = make_urlinfo(url)
+        return bool(info.netloc) and bool(info.scheme)
     
     def _filter_relevant_urls(self, urls: List[str]) -> List[str]:
-        """Filter URLs to keep only potentially relevant ones"""
+        """Filter URLs to keep only potentially relevant ones
+        
+        Every URL is recorded in discovered_sources on first sight, so the
+        result keeps discovery order and never repeats a URL, within a call
+        or across calls.
+        """
         filtered = []
+        seen = self.discovered_sources
         
         for url in urls:
-            url_lower = url.lower()
-            
             # Skip if already discovered
-            if url in self.discovered_sources:
+            if url in seen:
                 continue
+            seen.add(url)
+            url_lower = make_urlinfo(url).lower
             
             # Skip common irrelevant domains
             skip_domains = [
@@ -432,13 +782,13 @@ class IntelligentSourceDiscoveryModule:
             
             if any(indicator in url_lower for indicator in relevant_indicators):
                 filtered.append(url)
-                self.discovered_sources.add(url)
         
         return filtered
     
     async def close(self):
         """Clean up resources"""
         await self.model_client.close()
+        self.evaluation_store.close()
 
 # Example usage and testing
 async def test_discovery():
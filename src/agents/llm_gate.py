@@ -0,0 +1,142 @@
+"""
+LLM Gate
+Adaptive (AIMD) concurrency and request-rate control around model calls
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds to back off after a rate limit error that carries no retry-after
+DEFAULT_BACKOFF = 10.0
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a provider error, if the client exposed one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait, from the error's response headers"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    for name in ('retry-after', 'x-ratelimit-reset-requests'):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value.rstrip('s'))
+            except ValueError:
+                continue
+    return None
+
+
+def is_overload_error(error: Exception) -> bool:
+    """True for 429s and 5xx responses, which call for backing off"""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    message = str(error).lower()
+    return 'rate limit' in message or '429' in message
+
+
+class LLMGate:
+    """
+    Admission control for model calls
+
+    Concurrency follows AIMD: every healthy call (no error, latency under
+    target) adds 1/limit to the limit, so it grows by about one per round of
+    calls, and a 429 or 5xx halves it. Calls are also held back so that no
+    more than requests_per_minute start in any 60 second window, and all
+    calls pause for the provider's retry-after after a rate limit error.
+    """
+
+    def __init__(self, max_concurrency: int = 8, min_concurrency: int = 1,
+                 requests_per_minute: Optional[int] = None, latency_target: float = 60.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.requests_per_minute = requests_per_minute
+        self.latency_target = latency_target
+        self.limit = float(self.max_concurrency)
+
+        self._in_flight = 0
+        self._slots = asyncio.Condition()
+        self._rate_lock = asyncio.Lock()
+        self._started: Deque[float] = deque()
+        self._paused_until = 0.0
+
+        self.stats = {'calls': 0, 'overloads': 0, 'retries': 0}
+
+    async def call(self, make_call: Callable[[], Awaitable[Any]], retries: int = 2) -> Any:
+        """Run make_call() under the gate, retrying overload errors up to retries times"""
+        for attempt in range(retries + 1):
+            try:
+                return await self._run(make_call)
+            except Exception as e:
+                if attempt == retries or not is_overload_error(e):
+                    raise
+                self.stats['retries'] += 1
+                logger.warning(f"Model call overloaded, retrying ({attempt + 1}/{retries}): {e}")
+
+    async def _run(self, make_call: Callable[[], Awaitable[Any]]) -> Any:
+        await self._acquire()
+        started = time.monotonic()
+        try:
+            result = await make_call()
+        except Exception as e:
+            if is_overload_error(e):
+                self._on_overload(_retry_after(e))
+            raise
+        else:
+            self._on_success(time.monotonic() - started)
+            return result
+        finally:
+            await self._release()
+
+    async def _acquire(self) -> None:
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+        # Start times are claimed one caller at a time so waits do not overlap
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if self.requests_per_minute:
+                    while self._started and now - self._started[0] >= 60:
+                        self._started.popleft()
+                    if len(self._started) >= self.requests_per_minute:
+                        delay = max(delay, self._started[0] + 60 - now)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self._started.append(time.monotonic())
+            self.stats['calls'] += 1
+
+    async def _release(self) -> None:
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        if latency < self.latency_target and self.limit < self.max_concurrency:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+    def _on_overload(self, retry_after: Optional[float]) -> None:
+        self.stats['overloads'] += 1
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        pause = retry_after if retry_after is not None else DEFAULT_BACKOFF
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"Model overloaded, concurrency limit now {int(self.limit)}, pausing {pause:.0f}s")
+
+    def get_stats(self) -> dict:
+        """Counters and the current concurrency limit"""
+        return {**self.stats, 'concurrency_limit': int(self.limit), 'in_flight': self._in_flight}
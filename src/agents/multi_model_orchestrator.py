@@ -43,9 +43,10 @@ class MultiModelOrchestrator:
         self.active_teams = []
         self._closed = False
         
-        # Rate limiting
+        # Rate limiting, shared by concurrent calls
         self.last_api_call = 0
         self.min_call_interval = 2.0
+        self._rate_limit_lock = asyncio.Lock()
         
         # Initialize available models
         self._initialize_models()
@@ -103,25 +104,31 @@ class MultiModelOrchestrator:
         else:
             return None, None
     
-    async def _switch_model(self, reason=""):
-        """Switch to the other available model"""
-        if self.current_model == "openai" and self.gemini_client:
-            self.current_model = "gemini"
+    def _alternative_model(self, model, reason=""):
+        """The other available model, or the same one if there is no alternative"""
+        if model == "openai" and self.gemini_client:
             print(f"🔄 Switched to Gemini: {reason}")
-        elif self.current_model == "gemini" and self.openai_client:
-            self.current_model = "openai"
+            return "gemini"
+        elif model == "gemini" and self.openai_client:
             print(f"🔄 Switched to OpenAI: {reason}")
-        else:
-            print(f"⚠️  No alternative model available: {reason}")
+            return "openai"
+        print(f"⚠️  No alternative model available: {reason}")
+        return model
+    
+    async def _switch_model(self, reason=""):
+        """Switch the default model to the other available one"""
+        self.current_model = self._alternative_model(self.current_model, reason)
     
     async def _rate_limit_delay(self):
         """Add delay to respect rate limits"""
-        now = time.time()
-        time_since_last = now - self.last_api_call
-        if time_since_last < self.min_call_interval:
-            delay = self.min_call_interval - time_since_last
-            await asyncio.sleep(delay)
-        self.last_api_call = time.time()
+        # Serialized so concurrent calls are spaced out instead of all waking together
+        async with self._rate_limit_lock:
+            now = time.time()
+            time_since_last = now - self.last_api_call
+            if time_since_last < self.min_call_interval:
+                delay = self.min_call_interval - time_since_last
+                await asyncio.sleep(delay)
+            self.last_api_call = time.time()
         
     async def _create_fresh_team(self, agents_needed=None, preferred_model=None):
         """Create a fresh team with the best available model"""
@@ -132,9 +139,6 @@ class MultiModelOrchestrator:
                 print("❌ No model client available")
                 return None
             
-            # Update current model
-            self.current_model = model_name
-            
             # Add rate limiting delay
             await self._rate_limit_delay()
             
@@ -209,17 +213,17 @@ class MultiModelOrchestrator:
         
         team = None
         max_retries = 3
+        # Model fallback is tracked per call, so concurrent URLs do not switch each other's model
+        model = self.current_model
         
         for attempt in range(max_retries):
             try:
-                # Try with current model first
-                preferred_model = self.current_model
-                team = await self._create_fresh_team(['web_surfer', 'coder'], preferred_model)
+                team = await self._create_fresh_team(['web_surfer', 'coder'], model)
                 
                 if not team:
                     # Try with alternative model
-                    await self._switch_model("Primary model failed")
-                    team = await self._create_fresh_team(['web_surfer', 'coder'])
+                    model = self._alternative_model(model, "Primary model failed")
+                    team = await self._create_fresh_team(['web_surfer', 'coder'], model)
                     
                 if not team:
                     print(f"Failed to create team for {url}")
@@ -247,7 +251,7 @@ class MultiModelOrchestrator:
                 if "rate limit" in error_msg or "429" in error_msg:
                     if attempt < max_retries - 1:
                         # Switch model on rate limit
-                        await self._switch_model("Rate limit hit")
+                        model = self._alternative_model(model, "Rate limit hit")
                         wait_time = (attempt + 1) * 10
                         print(f"Rate limit hit, waiting {wait_time} seconds before retry {attempt + 1}/{max_retries}")
                         await asyncio.sleep(wait_time)
@@ -259,7 +263,7 @@ class MultiModelOrchestrator:
                     print(f"Error discovering grants from {url}: {e}")
                     # Try switching model on other errors too
                     if attempt < max_retries - 1:
-                        await self._switch_model("Error occurred")
+                        model = self._alternative_model(model, "Error occurred")
                         continue
                     return None
             finally:
@@ -289,10 +293,11 @@ class MultiModelOrchestrator:
         
         team = None
         max_retries = 3
+        model = self.current_model
         
         for attempt in range(max_retries):
             try:
-                team = await self._create_fresh_team(['file_surfer', 'coder'])
+                team = await self._create_fresh_team(['file_surfer', 'coder'], model)
                 if not team:
                     print(f"Failed to create team for PDF processing")
                     return None
@@ -308,7 +313,7 @@ class MultiModelOrchestrator:
                 error_msg = str(e).lower()
                 if "rate limit" in error_msg or "429" in error_msg:
                     if attempt < max_retries - 1:
-                        await self._switch_model("Rate limit hit")
+                        model = self._alternative_model(model, "Rate limit hit")
                         wait_time = (attempt + 1) * 10
                         print(f"Rate limit hit, waiting {wait_time} seconds before retry {attempt + 1}/{max_retries}")
                         await asyncio.sleep(wait_time)
@@ -319,7 +324,7 @@ class MultiModelOrchestrator:
                 else:
                     print(f"Error processing PDF {pdf_path}: {e}")
                     if attempt < max_retries - 1:
-                        await self._switch_model("Error occurred")
+                        model = self._alternative_model(model, "Error occurred")
                         continue
                     return None
             finally:
@@ -362,10 +367,11 @@ class MultiModelOrchestrator:
         
         team = None
         max_retries = 3
+        model = self.current_model
         
         for attempt in range(max_retries):
             try:
-                team = await self._create_fresh_team(['coder'])
+                team = await self._create_fresh_team(['coder'], model)
                 if not team:
                     print(f"Failed to create team for data validation")
                     return None
@@ -381,7 +387,7 @@ class MultiModelOrchestrator:
                 error_msg = str(e).lower()
                 if "rate limit" in error_msg or "429" in error_msg:
                     if attempt < max_retries - 1:
-                        await self._switch_model("Rate limit hit")
+                        model = self._alternative_model(model, "Rate limit hit")
                         wait_time = (attempt + 1) * 10
                         print(f"Rate limit hit, waiting {wait_time} seconds before retry {attempt + 1}/{max_retries}")
                         await asyncio.sleep(wait_time)
@@ -392,7 +398,7 @@ class MultiModelOrchestrator:
                 else:
                     print(f"Error validating grant data: {e}")
                     if attempt < max_retries - 1:
-                        await self._switch_model("Error occurred")
+                        model = self._alternative_model(model, "Error occurred")
                         continue
                     return None
             finally:
@@ -405,7 +411,7 @@ class MultiModelOrchestrator:
         """Clean up resources"""
         try:
             # Clean up active teams
-            for team in self.active_teams:
+            for team in list(self.active_teams):
                 await self._cleanup_team(team)
             
             # Close model clients
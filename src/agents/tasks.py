@@ -0,0 +1,134 @@
+"""
+Distributed Discovery Tasks
+Runs grant discovery as one Celery task per URL so missions scale across workers
+
+Start workers from the src directory:
+    celery -A agents.tasks worker --loglevel=info
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from celery import Celery, group
+from celery.signals import worker_process_shutdown
+
+from agents.enhanced_magentic_orchestrator import EnhancedGrantOracleOrchestrator
+
+logger = logging.getLogger(__name__)
+
+BROKER_URL = os.getenv('CELERY_BROKER_URL') or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+app = Celery(
+    'grant_oracle',
+    broker=BROKER_URL,
+    backend=os.getenv('CELERY_RESULT_BACKEND', BROKER_URL)
+)
+app.conf.update(
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    # A URL task runs for minutes; hand workers one at a time and requeue on crash
+    task_acks_late=True,
+    worker_prefetch_multiplier=1
+)
+
+# How long the mission coordinator waits for all URL tasks, in seconds
+MISSION_TIMEOUT = int(os.getenv('DISCOVERY_MISSION_TIMEOUT', 3600))
+
+
+class DiscoveryTaskError(Exception):
+    """A URL discovery failed with an error worth retrying"""
+
+
+# One event loop and orchestrator per worker process, created by the first task.
+# Building the orchestrator loads the processed-URL Bloom filter from Redis and
+# opens the model clients, so tasks reuse it; its clients and sessions belong to
+# the loop they were first used on, hence the long-lived loop instead of asyncio.run
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_orchestrator: Optional[EnhancedGrantOracleOrchestrator] = None
+
+
+def _run_on_worker_loop(coro):
+    """Run a coroutine on this process's event loop, creating it on first use"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop.run_until_complete(coro)
+
+
+def _get_orchestrator() -> EnhancedGrantOracleOrchestrator:
+    """This process's orchestrator
+
+    Its Bloom filter does not see URLs that other workers process later, so such
+    a URL would be processed again here. Missions only dispatch pending URLs, so
+    that takes a URL being queued twice.
+    """
+    global _worker_orchestrator
+    if _worker_orchestrator is None:
+        _worker_orchestrator = EnhancedGrantOracleOrchestrator()
+    return _worker_orchestrator
+
+
+@worker_process_shutdown.connect
+def _close_worker_orchestrator(**kwargs) -> None:
+    """Close the process's orchestrator and event loop when the worker exits"""
+    global _worker_orchestrator
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    try:
+        if _worker_orchestrator is not None:
+            _worker_loop.run_until_complete(_worker_orchestrator.close())
+    except Exception as e:
+        logger.warning(f"Closing the worker orchestrator failed: {e}")
+    finally:
+        _worker_orchestrator = None
+        _worker_loop.close()
+
+
+async def _process_url(url: str, can_retry: bool) -> List[Dict]:
+    """Discover and validate the grants on one URL with the worker's orchestrator
+
+    URL state and feedback go to the shared Redis store through the orchestrator.
+    """
+    orchestrator = _get_orchestrator()
+    grants_data = await orchestrator.discover_grants_from_url(url)
+    if grants_data is None:
+        feedback = orchestrator.get_url_feedback(url) or {}
+        if feedback.get('skipped'):
+            # Definitively failed the pre-flight check; a retry would fail it again
+            return []
+        if can_retry:
+            # Let the retry process the URL again instead of short-circuiting
+            orchestrator.reset_url_status(url)
+        raise DiscoveryTaskError(feedback.get('error', 'discovery failed'))
+
+    if not grants_data.get('grants'):
+        return []
+    return await orchestrator.validate_discovered_grants(url, grants_data)
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60)
+def run_url_task(self, url: str) -> List[Dict]:
+    """Celery task: discover grants from one URL"""
+    try:
+        return _run_on_worker_loop(_process_url(url, can_retry=self.request.retries < self.max_retries))
+    except DiscoveryTaskError as exc:
+        logger.warning(f"Discovery failed for {url} (attempt {self.request.retries + 1}): {exc}")
+        raise self.retry(exc=exc)
+
+
+def dispatch_urls(urls: List[str]) -> List[List[Dict]]:
+    """Queue one task per URL and wait for all of them
+
+    Returns the discovered grants of each URL whose task succeeded.
+    """
+    result = group(run_url_task.s(url) for url in urls).apply_async()
+    outcomes = result.get(timeout=MISSION_TIMEOUT, propagate=False)
+
+    failed = sum(1 for found in outcomes if not isinstance(found, list))
+    if failed:
+        logger.warning(f"{failed} of {len(urls)} discovery tasks failed")
+    return [found for found in outcomes if isinstance(found, list)]
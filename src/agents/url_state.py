@@ -0,0 +1,218 @@
+"""
+URL Processing State
+Keeps the orchestrator's URL sets and per-URL feedback in Redis so dedup and
+feedback survive restarts and are shared between workers
+"""
+
+import hashlib
+import logging
+import math
+from typing import Any, Dict, Iterator, Optional, Set
+
+import orjson
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'orchestrator:'
+
+# Most values a set holds back while Redis writes fail; the oldest are dropped beyond it
+UNSYNCED_MAX = 10_000
+
+
+def connect(redis_url: Optional[str]):
+    """Redis client for the URL state, or None to keep it in process memory"""
+    if redis_url and REDIS_AVAILABLE:
+        return redis.Redis.from_url(redis_url, decode_responses=True)
+    if redis_url:
+        logger.warning("redis is not installed, keeping URL state in memory")
+    return None
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings
+
+    Membership tests never miss an added value and wrongly report an absent
+    one with probability about error_rate once capacity values are added.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RedisSet:
+    """
+    Set of strings stored as a Redis SET
+
+    Every write also goes to a local copy, which answers reads when Redis is
+    not configured or a command fails. With a Bloom filter, membership tests
+    for values never added skip Redis, and when Redis holds the exact set the
+    filter replaces the local copy so memory stays constant. Values whose write
+    to Redis failed are held back (up to UNSYNCED_MAX) and sent with the next
+    write, and reads fall back to them while Redis is down.
+    """
+
+    def __init__(self, client, name: str, bloom: Optional[BloomFilter] = None):
+        self._redis = client
+        self.key = KEY_PREFIX + name
+        self._local: Set[str] = set()
+        self._bloom = bloom
+        self._keep_local = client is None or bloom is None
+        # Insertion-ordered, so the oldest value is dropped first when full
+        self._unsynced: Dict[str, None] = {}
+        if bloom is not None and client is not None:
+            self._load_bloom()
+
+    def _load_bloom(self) -> None:
+        """Add the members already in Redis to the Bloom filter"""
+        try:
+            for value in self._redis.sscan_iter(self.key, count=1000):
+                self._bloom.add(value)
+        except redis.RedisError as e:
+            logger.warning(f"URL state read failed: {e}")
+
+    def _hold_unsynced(self, value: str) -> None:
+        """Keep a value whose Redis write failed until a later write succeeds"""
+        self._unsynced[value] = None
+        if len(self._unsynced) > UNSYNCED_MAX:
+            dropped = next(iter(self._unsynced))
+            del self._unsynced[dropped]
+            logger.warning(f"URL state for {self.key} is over {UNSYNCED_MAX} unsynced values, dropping {dropped}")
+
+    def _fallback_members(self) -> Set[str]:
+        """What this process knows of the set when Redis cannot be read"""
+        return self._local | self._unsynced.keys()
+
+    def _fallback_contains(self, value: str) -> bool:
+        if self._keep_local:
+            return value in self._local
+        # Without an exact copy, trust the filter's "maybe"
+        return value in self._unsynced or (self._bloom is not None and value in self._bloom)
+
+    def add(self, value: str) -> None:
+        if self._keep_local:
+            self._local.add(value)
+        if self._bloom is not None:
+            self._bloom.add(value)
+        if self._redis is not None:
+            try:
+                self._redis.sadd(self.key, *self._unsynced, value)
+                self._unsynced.clear()
+            except redis.RedisError as e:
+                logger.warning(f"URL state write failed: {e}")
+                self._hold_unsynced(value)
+
+    def discard(self, value: str) -> None:
+        self._local.discard(value)
+        self._unsynced.pop(value, None)
+        if self._redis is not None:
+            try:
+                self._redis.srem(self.key, value)
+            except redis.RedisError as e:
+                logger.warning(f"URL state write failed: {e}")
+
+    def members(self) -> Set[str]:
+        """Snapshot of the set"""
+        if self._redis is not None:
+            try:
+                return self._redis.smembers(self.key)
+            except redis.RedisError as e:
+                logger.warning(f"URL state read failed: {e}")
+        return self._fallback_members()
+
+    def __contains__(self, value: str) -> bool:
+        if self._bloom is not None and value not in self._bloom:
+            return False
+        if self._redis is not None:
+            try:
+                return bool(self._redis.sismember(self.key, value))
+            except redis.RedisError as e:
+                logger.warning(f"URL state read failed: {e}")
+        return self._fallback_contains(value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.members())
+
+    def __len__(self) -> int:
+        if self._redis is not None:
+            try:
+                return self._redis.scard(self.key)
+            except redis.RedisError as e:
+                logger.warning(f"URL state read failed: {e}")
+        return len(self._fallback_members())
+
+    def __sub__(self, other: 'RedisSet') -> Set[str]:
+        if self._redis is not None and other._redis is not None:
+            try:
+                return self._redis.sdiff(self.key, other.key)
+            except redis.RedisError as e:
+                logger.warning(f"URL state read failed: {e}")
+        return {value for value in self._fallback_members() if not other._fallback_contains(value)}
+
+
+class FeedbackStore:
+    """
+    Per-URL processing feedback stored as one Redis hash per URL
+
+    Field values are JSON-encoded (orjson) on write and decoded on read, so nested
+    extraction data round-trips unchanged.
+    """
+
+    def __init__(self, client):
+        self._redis = client
+        self._local: Dict[str, Dict[str, Any]] = {}
+
+    def _key(self, url: str) -> str:
+        return KEY_PREFIX + 'task:' + hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            try:
+                fields = self._redis.hgetall(self._key(url))
+                return {name: orjson.loads(value) for name, value in fields.items()} or None
+            except redis.RedisError as e:
+                logger.warning(f"URL state read failed: {e}")
+        return self._local.get(url)
+
+    def __setitem__(self, url: str, feedback: Dict[str, Any]) -> None:
+        self._local[url] = feedback
+        if self._redis is not None:
+            key = self._key(url)
+            try:
+                pipe = self._redis.pipeline()
+                pipe.delete(key)
+                pipe.hset(key, mapping={name: orjson.dumps(value) for name, value in feedback.items()})
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning(f"URL state write failed: {e}")
+
+    def pop(self, url: str) -> None:
+        self._local.pop(url, None)
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._key(url))
+            except redis.RedisError as e:
+                logger.warning(f"URL state write failed: {e}")
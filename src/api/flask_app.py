@@ -8,8 +8,10 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.models import DatabaseManager, Grant
+from api.json_provider import ORJSONProvider
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)  # jsonify encodes with orjson
 CORS(app)  # Enable CORS for all routes
 
 # Initialize database
@@ -0,0 +1,70 @@
+"""
+Production WSGI server for the Flask apps
+Runs gunicorn with threaded workers, falling back to Flask's server where gunicorn is unavailable
+"""
+
+import importlib
+import multiprocessing
+import os
+import threading
+
+from werkzeug.serving import make_server
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:  # gunicorn does not run on Windows
+    GUNICORN_AVAILABLE = False
+
+
+def _load_app(app_path):
+    """Import a 'module:attribute' path and return the WSGI app"""
+    module_name, _, attribute = app_path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'app')
+
+
+if GUNICORN_AVAILABLE:
+    class GunicornApplication(BaseApplication):
+        """Embedded gunicorn server for a Flask app given by import path"""
+
+        def __init__(self, app_path, options):
+            self.app_path = app_path
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Imported in each worker (no preload), so every worker opens its own
+            # database connections instead of sharing sockets inherited from the master
+            return _load_app(self.app_path)
+
+
+def serve(app_path, host='0.0.0.0', port=5000):
+    """Serve a Flask app with gunicorn gthread workers"""
+    if not GUNICORN_AVAILABLE:
+        _load_app(app_path).run(host=host, port=port, debug=False, threaded=True)
+        return
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)),
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('WEB_THREADS', 4)),
+        'timeout': 120,
+    }
+    GunicornApplication(app_path, options).run()
+
+
+def serve_in_background(app, host='0.0.0.0', port=5000):
+    """Serve a WSGI app from a daemon thread, one thread per request
+
+    For processes whose main thread runs something else, such as the
+    scheduler's event loop (gunicorn needs the main thread for its signal
+    handling). Returns the server; call shutdown() on it to stop serving.
+    """
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    return server
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, JSON, Boolean
+from sqlalchemy import create_engine, func, text, Column, String, Integer, Float, DateTime, JSON, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from dataclasses import dataclass, fields, asdict
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
+import json
 import os
+import threading
 
 Base = declarative_base()
 
@@ -46,20 +50,175 @@ class Grant(Base):
     # Enhancement 5: Application Complexity Indicator
     application_complexity = Column(String, default='medium')  # simple | medium | complex | very_complex
 
+@dataclass(slots=True)
+class GrantRecord:
+    """Grant payload carried from extraction to the database
+    
+    A slotted dataclass instead of a plain dict, so the many records built per
+    cycle stay small and fields are read as attributes. Only the fields that
+    map to Grant columns are written; the discovery metadata is kept alongside.
+    """
+    id: str
+    title: str
+    bucket: Optional[str] = None
+    instrument: Any = None
+    min_ticket_lakh: Optional[float] = None
+    max_ticket_lakh: Optional[float] = None
+    typical_ticket_lakh: Optional[float] = None
+    deadline_type: Optional[str] = None
+    next_deadline_iso: Optional[str] = None
+    eligibility_flags: Any = None
+    sector_tags: Any = None
+    state_scope: Optional[str] = None
+    agency: Optional[str] = None
+    source_urls: Any = None
+    confidence: Optional[float] = None
+    status: Optional[str] = None
+    data_lineage: Any = None
+    eligibility_criteria: Any = None
+    target_audience: Any = None
+    application_complexity: Optional[str] = None
+    
+    # Discovery metadata (not stored on the grants table)
+    source_url: str = ''
+    discovered_at: str = ''
+    discovery_method: str = ''
+    
+    @classmethod
+    def from_dict(cls, data, **meta):
+        """Build a record from extracted grant data, ignoring unknown keys"""
+        known = {k: v for k, v in data.items() if k in _RECORD_FIELDS}
+        known.update(meta)
+        return cls(**known)
+    
+    def to_row(self):
+        """Column values for the grants table, leaving out unset fields"""
+        return {k: v for k, v in asdict(self).items() if k in _GRANT_COLUMNS and v is not None}
+
+_RECORD_FIELDS = frozenset(f.name for f in fields(GrantRecord))
+_GRANT_COLUMNS = frozenset(Grant.__table__.columns.keys())
+
+# Columns written by the prepared upsert, with their PostgreSQL parameter types
+UPSERT_COLUMNS = [
+    ('id', 'text'), ('title', 'text'), ('bucket', 'text'), ('instrument', 'jsonb'),
+    ('min_ticket_lakh', 'numeric'), ('max_ticket_lakh', 'numeric'), ('typical_ticket_lakh', 'numeric'),
+    ('deadline_type', 'text'), ('next_deadline_iso', 'text'), ('eligibility_flags', 'jsonb'),
+    ('sector_tags', 'jsonb'), ('state_scope', 'text'), ('agency', 'text'), ('source_urls', 'jsonb'),
+    ('confidence', 'numeric'), ('status', 'text'), ('data_lineage', 'jsonb'),
+    ('eligibility_criteria', 'jsonb'), ('target_audience', 'jsonb'), ('application_complexity', 'text'),
+]
+_UPSERT_COLUMN_NAMES = frozenset(name for name, _ in UPSERT_COLUMNS)
+_UPSERT_JSON_COLUMNS = frozenset(name for name, type_ in UPSERT_COLUMNS if type_ == 'jsonb')
+
+# NULL parameters keep the existing value (or the column default on insert),
+# matching the ORM path where only the keys that are present get set
+_UPSERT_INSERT_DEFAULTS = {'status': "'live'", 'application_complexity': "'medium'"}
+
+# Columns the ORM fills from Python-side defaults, set the same way on insert
+_UTC_NOW = "(now() AT TIME ZONE 'utc')"
+_UPSERT_INSERT_EXTRAS = {
+    'last_seen_iso': _UTC_NOW, 'created_iso': _UTC_NOW, 'last_checked_iso': _UTC_NOW, 'is_duplicate': 'FALSE'
+}
+
+def prepare_grant_upsert_sql(json_types):
+    """PREPARE statement for the grant upsert
+    
+    json_types maps each JSON column to its type in the live table: 'json'
+    for tables made by create_all, 'jsonb' for scripts/setup-database.sql.
+    Parameters must match, or COALESCE cannot reconcile the two.
+    """
+    types = [json_types.get(name, 'jsonb') if type_ == 'jsonb' else type_ for name, type_ in UPSERT_COLUMNS]
+    return (
+        "PREPARE grant_upsert ({types}) AS "
+        "INSERT INTO grants ({columns}) VALUES ({values}) "
+        "ON CONFLICT (id) DO UPDATE SET {updates}, last_seen_iso = {now}"
+    ).format(
+        types=', '.join(types),
+        columns=', '.join([name for name, _ in UPSERT_COLUMNS] + list(_UPSERT_INSERT_EXTRAS)),
+        values=', '.join([
+            f"COALESCE(${i}, {_UPSERT_INSERT_DEFAULTS[name]})" if name in _UPSERT_INSERT_DEFAULTS else f"${i}"
+            for i, (name, _) in enumerate(UPSERT_COLUMNS, start=1)
+        ] + list(_UPSERT_INSERT_EXTRAS.values())),
+        updates=', '.join(
+            f"{name} = COALESCE(${i}, grants.{name})"
+            for i, (name, _) in enumerate(UPSERT_COLUMNS, start=1) if name != 'id'
+        ),
+        now=_UTC_NOW
+    )
+
+EXECUTE_GRANT_UPSERT = f"EXECUTE grant_upsert ({', '.join(['%s'] * len(UPSERT_COLUMNS))})"
+
+# Behind PgBouncer in transaction pooling mode, consecutive transactions can
+# land on different server connections, so session state (prepared statements,
+# startup options) cannot be relied on
+PGBOUNCER = os.getenv('DB_PGBOUNCER', '').lower() in ('1', 'true', 'yes')
+
+# One engine (and so one connection pool) per database URL, shared by every
+# DatabaseManager in the process instead of each opening its own connections
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(database_url):
+    """Get the shared engine for a database URL, creating it on first use"""
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            if database_url.startswith('sqlite'):
+                engine = create_engine(database_url)
+            else:
+                connect_args = {}
+                if not PGBOUNCER:
+                    # Cap runaway queries server-side (PgBouncer rejects startup options)
+                    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 15000))
+                    connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+                engine = create_engine(
+                    database_url,
+                    pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+                    max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 15)),
+                    pool_pre_ping=True,
+                    pool_recycle=1800,
+                    connect_args=connect_args
+                )
+            _engines[database_url] = engine
+        return engine
+
+# Bumped on every grants write in this process, so read caches built on top of
+# DatabaseManager can tell their data is stale without polling the database
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+def get_data_version():
+    """Current in-process grants write counter"""
+    return _data_version
+
+def _bump_data_version():
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
 class DatabaseManager:
     def __init__(self, database_url=None):
         if database_url is None:
             # Use SQLite for development by default
             database_url = os.getenv('DATABASE_URL', 'sqlite:///grants.db')
         
-        self.engine = create_engine(database_url)
+        self.engine = get_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
+        # Reads run in autocommit mode on the same pool: no BEGIN/ROLLBACK round-trips
+        # and no transaction held open while results are streamed
+        self.read_engine = self.engine.execution_options(isolation_level='AUTOCOMMIT')
+        self.ReadSessionLocal = sessionmaker(autoflush=False, bind=self.read_engine)
+        
     def create_tables(self):
         Base.metadata.create_all(bind=self.engine)
         
     def get_session(self):
         return self.SessionLocal()
+    
+    def get_read_session(self):
+        """Session for read-only queries"""
+        return self.ReadSessionLocal()
         
     def upsert_grant(self, grant_data):
         session = self.get_session()
@@ -78,6 +237,7 @@ class DatabaseManager:
                 session.add(grant)
             
             session.commit()
+            _bump_data_version()
             return True
         except Exception as e:
             session.rollback()
@@ -86,8 +246,110 @@ class DatabaseManager:
         finally:
             session.close()
             
+    def upsert_grants_bulk(self, grants_data, batch_size=100):
+        """Upsert grants in batches, one query and one commit per batch
+        
+        Accepts dicts or GrantRecords and returns the ones that were saved. If a
+        batch fails, its grants are retried one by one so a single bad record
+        doesn't drop the rest.
+        """
+        saved = []
+        for start in range(0, len(grants_data), batch_size):
+            batch = grants_data[start:start + batch_size]
+            rows = [item.to_row() if isinstance(item, GrantRecord) else item for item in batch]
+            if self._can_use_prepared_upsert(rows):
+                try:
+                    self._upsert_rows_prepared(rows)
+                    saved.extend(batch)
+                    continue
+                except Exception as e:
+                    print(f"Prepared grant upsert failed, using the ORM path: {e}")
+            
+            session = self.get_session()
+            try:
+                # Load every existing grant in the batch with a single query
+                ids = [grant_data['id'] for grant_data in rows]
+                existing = {grant.id: grant for grant in session.query(Grant).filter(Grant.id.in_(ids))}
+                
+                for grant_data in rows:
+                    grant = existing.get(grant_data['id'])
+                    if grant:
+                        for key, value in grant_data.items():
+                            setattr(grant, key, value)
+                        grant.last_seen_iso = datetime.utcnow()
+                    else:
+                        grant = Grant(**grant_data)
+                        session.add(grant)
+                        existing[grant.id] = grant
+                
+                session.commit()
+                _bump_data_version()
+                saved.extend(batch)
+                continue
+            except Exception as e:
+                session.rollback()
+                print(f"Error upserting grant batch, retrying individually: {e}")
+            finally:
+                session.close()
+            
+            saved.extend(item for item, grant_data in zip(batch, rows) if self.upsert_grant(grant_data))
+        
+        return saved
+    
+    def _can_use_prepared_upsert(self, rows):
+        """Whether a batch can go through the prepared grant_upsert statement"""
+        return (self.engine.dialect.driver == 'psycopg2' and not PGBOUNCER
+                and all(grant_data.keys() <= _UPSERT_COLUMN_NAMES for grant_data in rows))
+    
+    def _prepare_grant_upsert(self, cursor):
+        """PREPARE grant_upsert on this connection, typed after the live grants table"""
+        cursor.execute(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'grants'"
+        )
+        column_types = dict(cursor.fetchall())
+        if not column_types:
+            raise RuntimeError("grants table does not exist yet")
+        json_types = {name: column_types[name] for name in _UPSERT_JSON_COLUMNS if name in column_types}
+        cursor.execute(prepare_grant_upsert_sql(json_types))
+    
+    def _upsert_rows_prepared(self, rows):
+        """Upsert a batch with EXECUTE grant_upsert, skipping the per-batch parse and plan"""
+        from psycopg2.extras import execute_batch
+        
+        params = [
+            tuple(
+                json.dumps(grant_data.get(name))
+                if name in _UPSERT_JSON_COLUMNS and grant_data.get(name) is not None
+                else grant_data.get(name)
+                for name, _ in UPSERT_COLUMNS
+            )
+            for grant_data in rows
+        ]
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                # Prepared lazily, once per pooled connection; the flag lives on
+                # the connection record, so a replaced connection prepares again
+                if not connection.info.get('grant_upsert_prepared'):
+                    self._prepare_grant_upsert(cursor)
+                    connection.commit()
+                    connection.info['grant_upsert_prepared'] = True
+                execute_batch(cursor, EXECUTE_GRANT_UPSERT, params, page_size=200)
+            finally:
+                cursor.close()
+            connection.commit()
+            _bump_data_version()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+            
     def get_grants(self, filters=None, limit=None):
-        session = self.get_session()
+        session = self.get_read_session()
         try:
             query = session.query(Grant)
             
@@ -107,4 +369,116 @@ class DatabaseManager:
             return query.all()
         finally:
             session.close()
-
+            
+    def ping(self):
+        """Check database connectivity with a trivial query"""
+        with self.read_engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    
+    def count_grants(self, status=None):
+        """Count grants (optionally with a given status) without loading any rows"""
+        session = self.get_read_session()
+        try:
+            query = session.query(func.count(Grant.id))
+            if status:
+                query = query.filter(Grant.status == status)
+            return query.scalar()
+        finally:
+            session.close()
+            
+    def iter_grant_rows(self, columns, cursor=None, limit=None, batch_size=500):
+        """Yield the given grant columns as plain dicts, in id order after the cursor id
+        
+        Only the requested columns are selected and no ORM objects are built.
+        Rows are fetched batch_size at a time (keyset pagination on the primary
+        key) so callers can stream any number of grants in flat memory. Each
+        batch is its own LIMIT query rather than a server-side cursor, which
+        psycopg2 refuses to open on the autocommit read connection.
+        """
+        selected = [getattr(Grant, column) for column in columns]
+        if 'id' not in columns:
+            # The last id of each batch is where the next one starts
+            selected.append(Grant.id)
+        
+        remaining = limit
+        session = self.get_read_session()
+        try:
+            while remaining is None or remaining > 0:
+                size = batch_size if remaining is None else min(batch_size, remaining)
+                query = session.query(*selected)
+                if cursor:
+                    query = query.filter(Grant.id > cursor)
+                rows = query.order_by(Grant.id).limit(size).all()
+                
+                for row in rows:
+                    grant = row._asdict()
+                    cursor = grant['id'] if 'id' in columns else grant.pop('id')
+                    yield grant
+                
+                if len(rows) < size:
+                    break
+                if remaining is not None:
+                    remaining -= len(rows)
+        finally:
+            session.close()
+            
+    def get_stats(self):
+        """Count grants in total, live, and per bucket with a single GROUP BY query"""
+        session = self.get_read_session()
+        try:
+            rows = session.query(
+                Grant.bucket, Grant.status, func.count(Grant.id)
+            ).group_by(Grant.bucket, Grant.status).all()
+            
+            total_grants = 0
+            live_grants = 0
+            bucket_stats = {}
+            for bucket, status, count in rows:
+                total_grants += count
+                if status == 'live':
+                    live_grants += count
+                bucket = bucket or 'Unknown'
+                bucket_stats[bucket] = bucket_stats.get(bucket, 0) + count
+            
+            return {
+                'total_grants': total_grants,
+                'live_grants': live_grants,
+                'grants_by_bucket': bucket_stats
+            }
+        finally:
+            session.close()
+            
+    def get_expiring_grants(self, days=7):
+        """Get live grants whose next deadline falls within the given number of days
+        
+        Deadlines are stored as ISO-8601 strings, which sort chronologically, so
+        the cutoff is a plain string comparison served by the deadline index.
+        Only the date prefix matters: anything before the day after the window
+        is included, whatever its time or offset suffix. Values that do not
+        start with a YYYY-MM-DD date ("15 March 2026", "01/04/2026") would
+        compare wrongly, so they are left out.
+        """
+        cutoff = (date.today() + timedelta(days=days + 1)).isoformat()
+        session = self.get_read_session()
+        try:
+            rows = session.query(
+                Grant.id, Grant.title, Grant.agency, Grant.next_deadline_iso, Grant.typical_ticket_lakh
+            ).filter(
+                Grant.status == 'live',
+                Grant.next_deadline_iso.isnot(None),
+                Grant.next_deadline_iso.regexp_match(r'^\d{4}-\d{2}-\d{2}'),
+                Grant.next_deadline_iso < cutoff
+            ).all()
+            
+            return [
+                {
+                    'id': row.id,
+                    'title': row.title,
+                    'agency': row.agency,
+                    'next_deadline_iso': row.next_deadline_iso,
+                    'typical_ticket_lakh': row.typical_ticket_lakh
+                }
+                for row in rows
+            ]
+        finally:
+            session.close()
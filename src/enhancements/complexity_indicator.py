@@ -7,6 +7,8 @@ import re
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from enhancements.numeric_kernels import application_stages, funding_band
+
 
 class ApplicationComplexityAnalyzer:
     """Analyze and score application complexity for grants"""
@@ -179,15 +181,7 @@ class ApplicationComplexityAnalyzer:
         """Analyze number of application stages"""
         # Estimate stages based on grant type and funding amount
         funding_amount = grant.get('typical_ticket_lakh', 0) or grant.get('max_ticket_lakh', 0)
-        
-        if funding_amount < 10:
-            stages = 1
-        elif funding_amount < 50:
-            stages = 2
-        elif funding_amount < 200:
-            stages = 3
-        else:
-            stages = 4
+        stages = application_stages(float(funding_amount or 0))
         
         # Convert to score
         if stages == 1:
@@ -301,18 +295,9 @@ class ApplicationComplexityAnalyzer:
         """Analyze funding amount impact on complexity"""
         funding_amount = grant.get('typical_ticket_lakh', 0) or grant.get('max_ticket_lakh', 0)
         
-        if funding_amount <= 10:
-            score = 0.2
-            level = 'simple'
-        elif funding_amount <= 50:
-            score = 0.4
-            level = 'medium'
-        elif funding_amount <= 200:
-            score = 0.7
-            level = 'complex'
-        else:
-            score = 1.0
-            level = 'very_complex'
+        band = funding_band(float(funding_amount or 0))
+        score = (0.2, 0.4, 0.7, 1.0)[band]
+        level = ('simple', 'medium', 'complex', 'very_complex')[band]
         
         return {
             'score': score,
@@ -3,25 +3,32 @@ Eligibility Matching Score Enhancement
 Calculates how well a startup profile matches grant eligibility criteria
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import re
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from enhancements.numeric_kernels import funding_match_scores
+
+
+# Scoring weights for different criteria
+SCORE_WEIGHTS = {
+    'stage_match': 0.25,        # Startup stage alignment
+    'sector_match': 0.20,       # Sector/industry alignment  
+    'location_match': 0.15,     # Geographic eligibility
+    'funding_match': 0.15,      # Funding amount alignment
+    'age_match': 0.10,          # Company age requirements
+    'size_match': 0.10,         # Company size requirements
+    'special_criteria': 0.05    # Special eligibility criteria
+}
+
 
 class EligibilityMatcher:
     """Calculate eligibility matching scores for startups against grants"""
     
     def __init__(self):
-        # Scoring weights for different criteria
-        self.weights = {
-            'stage_match': 0.25,        # Startup stage alignment
-            'sector_match': 0.20,       # Sector/industry alignment  
-            'location_match': 0.15,     # Geographic eligibility
-            'funding_match': 0.15,      # Funding amount alignment
-            'age_match': 0.10,          # Company age requirements
-            'size_match': 0.10,         # Company size requirements
-            'special_criteria': 0.05    # Special eligibility criteria
-        }
+        self.weights = dict(SCORE_WEIGHTS)
         
         # Stage mappings
         self.stage_mappings = {
@@ -54,6 +61,36 @@ class EligibilityMatcher:
         Returns:
             Dictionary with eligibility score and breakdown
         """
+        scores = self.calculate_score_breakdown(startup_profile, grant)
+        
+        # Calculate weighted overall score
+        overall_score = sum(
+            scores[criterion] * self.weights[criterion] 
+            for criterion in scores
+        )
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(scores, startup_profile, grant)
+        
+        return {
+            'overall_score': round(overall_score, 2),
+            'score_breakdown': scores,
+            'recommendations': recommendations,
+            'calculated_at': datetime.now().isoformat()
+        }
+    
+    def calculate_score_breakdown(self, startup_profile: Dict[str, Any],
+                                  grant: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Calculate the per-criterion scores between startup and grant
+        
+        Args:
+            startup_profile: Dictionary containing startup information
+            grant: Dictionary containing grant information
+            
+        Returns:
+            Dictionary mapping each weighted criterion to its score
+        """
         scores = {}
         
         # Stage matching
@@ -65,7 +102,7 @@ class EligibilityMatcher:
         # Sector matching
         scores['sector_match'] = self._calculate_sector_match(
             startup_profile.get('sectors', []), 
-            grant.get('sector_tags', [])
+            grant.get('sector_tags') or []
         )
         
         # Location matching
@@ -85,38 +122,135 @@ class EligibilityMatcher:
         # Company age matching
         scores['age_match'] = self._calculate_age_match(
             startup_profile.get('company_age_years'), 
-            grant.get('eligibility_criteria', {})
+            grant.get('eligibility_criteria') or {}
         )
         
         # Company size matching
         scores['size_match'] = self._calculate_size_match(
             startup_profile.get('team_size'), 
             startup_profile.get('revenue_lakh'),
-            grant.get('target_audience', {})
+            grant.get('target_audience') or {}
         )
         
         # Special criteria matching
         scores['special_criteria'] = self._calculate_special_criteria_match(
             startup_profile, 
-            grant.get('eligibility_flags', [])
+            grant.get('eligibility_flags') or []
         )
         
-        # Calculate weighted overall score
-        overall_score = sum(
-            scores[criterion] * self.weights[criterion] 
-            for criterion in scores
-        )
+        return scores
+    
+    def rank_grants(self, startup_profile: Dict[str, Any],
+                    grants: List[Dict[str, Any]],
+                    top_n: int = 20) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Score a batch of grants and return only the best matches
         
-        # Generate recommendations
-        recommendations = self._generate_recommendations(scores, startup_profile, grant)
+        Each criterion is scored as one column over all grants: funding with
+        array operations, and the text criteria once per distinct grant value
+        (there are few buckets, scopes and tag lists), mapped back onto the
+        grants. The (grants x criteria) matrix is then weighted in one product,
+        and only the top ``top_n`` grants pay for recommendation generation.
+        
+        Args:
+            startup_profile: Dictionary containing startup information
+            grants: List of grant dictionaries (or dict-like database rows)
+            top_n: Number of matches to return
+            
+        Returns:
+            List of (grant, match result) pairs, best match first
+        """
+        if not grants or top_n <= 0:
+            return []
+        
+        criteria = list(self.weights)
+        columns = self._score_columns(startup_profile, grants)
+        matrix = np.column_stack([columns[criterion] for criterion in criteria])
+        
+        weights = np.array([self.weights[criterion] for criterion in criteria])
+        overall = np.round(matrix @ weights, 2)
+        
+        # Partial selection instead of sorting every grant
+        if len(grants) > top_n:
+            top = np.argpartition(-overall, top_n - 1)[:top_n]
+        else:
+            top = np.arange(len(grants))
+        top = top[np.argsort(-overall[top], kind='stable')]
+        
+        calculated_at = datetime.now().isoformat()
+        ranked = []
+        for idx in top:
+            grant = grants[idx]
+            scores = dict(zip(criteria, matrix[idx].tolist()))
+            ranked.append((grant, {
+                'overall_score': float(overall[idx]),
+                'score_breakdown': scores,
+                'recommendations': self._generate_recommendations(scores, startup_profile, grant),
+                'calculated_at': calculated_at
+            }))
+        
+        return ranked
+    
+    def _score_columns(self, startup_profile: Dict[str, Any],
+                       grants: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Score every grant on each criterion, as one array per criterion"""
+        stage = startup_profile.get('stage')
+        sectors = startup_profile.get('sectors', [])
+        location = startup_profile.get('location')
+        company_age = startup_profile.get('company_age_years')
+        team_size = startup_profile.get('team_size')
+        revenue = startup_profile.get('revenue_lakh')
+        criteria_of = [grant.get('eligibility_criteria') or {} for grant in grants]
+        audience_of = [grant.get('target_audience') or {} for grant in grants]
         
         return {
-            'overall_score': round(overall_score, 2),
-            'score_breakdown': scores,
-            'recommendations': recommendations,
-            'calculated_at': datetime.now().isoformat()
+            'stage_match': self._score_distinct(
+                [grant.get('bucket') for grant in grants],
+                lambda bucket: self._calculate_stage_match(stage, bucket)
+            ),
+            'sector_match': self._score_distinct(
+                [tuple(grant.get('sector_tags') or ()) for grant in grants],
+                lambda tags: self._calculate_sector_match(sectors, list(tags))
+            ),
+            'location_match': self._score_distinct(
+                [grant.get('state_scope') for grant in grants],
+                lambda scope: self._calculate_location_match(location, scope)
+            ),
+            'funding_match': funding_match_scores(
+                startup_profile.get('funding_needed'),
+                [grant.get('typical_ticket_lakh') for grant in grants],
+                [grant.get('min_ticket_lakh') for grant in grants],
+                [grant.get('max_ticket_lakh') for grant in grants]
+            ),
+            'age_match': self._score_distinct(
+                [(criteria.get('company_age_min', 0), criteria.get('company_age_max')) for criteria in criteria_of],
+                lambda ages: self._calculate_age_match(
+                    company_age, {'company_age_min': ages[0], 'company_age_max': ages[1]}
+                )
+            ),
+            'size_match': self._score_distinct(
+                [(audience.get('team_size_max'), audience.get('revenue_max')) for audience in audience_of],
+                lambda limits: self._calculate_size_match(
+                    team_size, revenue, {'team_size_max': limits[0], 'revenue_max': limits[1]}
+                )
+            ),
+            'special_criteria': self._score_distinct(
+                [tuple(grant.get('eligibility_flags') or ()) for grant in grants],
+                lambda flags: self._calculate_special_criteria_match(startup_profile, list(flags))
+            ),
         }
     
+    @staticmethod
+    def _score_distinct(values: List[Any], score) -> np.ndarray:
+        """Score each distinct value once and map the scores back onto the grants"""
+        scores: Dict[Any, float] = {}
+        column = np.empty(len(values))
+        for i, value in enumerate(values):
+            if value not in scores:
+                scores[value] = score(value)
+            column[i] = scores[value]
+        return column
+    
     def _calculate_stage_match(self, startup_stage: Optional[str], 
                               grant_bucket: Optional[str]) -> float:
         """Calculate stage alignment score"""
@@ -203,32 +337,7 @@ class EligibilityMatcher:
                                 min_amount: Optional[float], 
                                 max_amount: Optional[float]) -> float:
         """Calculate funding amount alignment score"""
-        if not funding_needed:
-            return 0.5
-        
-        # Use typical amount if available, otherwise use range
-        if typical_amount:
-            target_amount = typical_amount
-        elif min_amount and max_amount:
-            target_amount = (min_amount + max_amount) / 2
-        elif max_amount:
-            target_amount = max_amount
-        else:
-            return 0.5
-        
-        # Calculate how well the amounts align
-        ratio = min(funding_needed, target_amount) / max(funding_needed, target_amount)
-        
-        if ratio >= 0.8:
-            return 1.0
-        elif ratio >= 0.6:
-            return 0.8
-        elif ratio >= 0.4:
-            return 0.6
-        elif ratio >= 0.2:
-            return 0.4
-        else:
-            return 0.2
+        return float(funding_match_scores(funding_needed, [typical_amount], [min_amount], [max_amount])[0])
     
     def _calculate_age_match(self, company_age: Optional[float], 
                             eligibility_criteria: Dict[str, Any]) -> float:
@@ -346,6 +455,24 @@ class EligibilityMatcher:
         return recommendations
 
 
+def rank_startup_grant_matches(startup_profile: Dict[str, Any],
+                               grants: List[Dict[str, Any]],
+                               top_n: int = 20) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Rank grants for a startup and return the top matches
+    
+    Args:
+        startup_profile: Startup information
+        grants: Grant information for every candidate grant
+        top_n: Number of matches to return
+        
+    Returns:
+        List of (grant, eligibility matching results) pairs, best first
+    """
+    matcher = EligibilityMatcher()
+    return matcher.rank_grants(startup_profile, grants, top_n)
+
+
 def calculate_startup_grant_match(startup_profile: Dict[str, Any], 
                                 grant: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -0,0 +1,63 @@
+"""
+Numeric Scoring Kernels
+Funding arithmetic shared by the eligibility and complexity scorers
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Upper bounds, in lakh, of the funding bands the complexity scorer works with
+FUNDING_BAND_EDGES = (10, 50, 200)
+
+# Funding ratio thresholds and the score each earns; lower ratios score 0.2
+FUNDING_RATIO_THRESHOLDS = (0.8, 0.6, 0.4, 0.2)
+FUNDING_RATIO_SCORES = (1.0, 0.8, 0.6, 0.4)
+
+
+def _is_set(amounts: np.ndarray) -> np.ndarray:
+    # Zero and NaN both mean "not set"
+    return np.nan_to_num(amounts) != 0.0
+
+
+def funding_match_scores(funding_needed: Optional[float],
+                         typical_amounts: Sequence[Optional[float]],
+                         min_amounts: Sequence[Optional[float]],
+                         max_amounts: Sequence[Optional[float]]) -> np.ndarray:
+    """
+    Score how well the requested funding aligns with each grant's ticket size
+
+    The amount sequences hold one value per grant, with None or NaN for
+    missing values; all grants are scored in one set of array operations.
+    """
+    typical = np.asarray(typical_amounts, dtype=float)
+    minimum = np.asarray(min_amounts, dtype=float)
+    maximum = np.asarray(max_amounts, dtype=float)
+
+    if not funding_needed or funding_needed != funding_needed:
+        return np.full(typical.shape, 0.5)
+
+    # Use typical amount if available, otherwise use range
+    has_min, has_max = _is_set(minimum), _is_set(maximum)
+    target = np.where(
+        _is_set(typical), typical,
+        np.where(has_min & has_max, (minimum + maximum) / 2, np.where(has_max, maximum, np.nan))
+    )
+
+    # Calculate how well the amounts align
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.minimum(funding_needed, target) / np.maximum(funding_needed, target)
+    scores = np.select([ratio >= threshold for threshold in FUNDING_RATIO_THRESHOLDS],
+                       FUNDING_RATIO_SCORES, 0.2)
+    return np.where(np.isnan(target), 0.5, scores)
+
+
+def application_stages(funding_amount: float) -> int:
+    """Estimate the number of application stages (1-4) from the funding amount"""
+    return bisect_right(FUNDING_BAND_EDGES, funding_amount) + 1
+
+
+def funding_band(funding_amount: float) -> int:
+    """Map a funding amount to a complexity band (0=simple .. 3=very_complex)"""
+    return bisect_left(FUNDING_BAND_EDGES, funding_amount)
@@ -3,14 +3,30 @@ Grant Status Monitoring Enhancement
 Monitors grant status and detects when grants close or deadlines pass
 """
 
+import asyncio
+import aiohttp
 import requests
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 import re
 from urllib.parse import urlparse
 import logging
 
 
+@lru_cache(maxsize=4096)
+def parse_deadline(deadline_str: str) -> datetime:
+    """
+    Parse a stored deadline string
+
+    Memoized per distinct string: deadlines rarely change between monitoring
+    runs, so repeat checks of the same grant skip the string handling.
+    """
+    if 'T' in deadline_str:
+        return datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
+    return datetime.strptime(deadline_str, '%Y-%m-%d')
+
+
 class GrantStatusMonitor:
     """Monitor grant status and detect changes"""
     
@@ -43,6 +59,40 @@ class GrantStatusMonitor:
         Returns:
             Dictionary with status information
         """
+        status_info = self._check_offline_status(grant)
+        if status_info['deadline_status'] == 'expired':
+            return status_info
+        
+        # Check website status
+        website_status = self._check_website_status(grant)
+        status_info.update(website_status)
+        
+        return status_info
+    
+    async def check_grant_status_async(self, session: aiohttp.ClientSession,
+                                       grant: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check the current status of a grant without blocking the event loop
+        
+        Args:
+            session: Shared aiohttp session used for the website check
+            grant: Grant dictionary with source URLs and deadline info
+            
+        Returns:
+            Dictionary with status information
+        """
+        status_info = self._check_offline_status(grant)
+        if status_info['deadline_status'] == 'expired':
+            return status_info
+        
+        # Check website status
+        website_status = await self._check_website_status_async(session, grant)
+        status_info.update(website_status)
+        
+        return status_info
+    
+    def _check_offline_status(self, grant: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the initial status information from the grant's deadline"""
         status_info = {
             'status': grant.get('status', 'live'),
             'status_reason': None,
@@ -61,11 +111,6 @@ class GrantStatusMonitor:
             status_info['status'] = 'expired'
             status_info['status_reason'] = 'deadline_passed'
             status_info['status_confidence'] = 1.0
-            return status_info
-        
-        # Check website status
-        website_status = self._check_website_status(grant)
-        status_info.update(website_status)
         
         return status_info
     
@@ -85,10 +130,7 @@ class GrantStatusMonitor:
         
         try:
             # Parse deadline
-            if 'T' in deadline_str:
-                deadline = datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-            else:
-                deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
+            deadline = parse_deadline(deadline_str)
             
             now = datetime.now()
             if deadline.tzinfo:
@@ -120,30 +162,14 @@ class GrantStatusMonitor:
             'status_confidence': 0.5
         }
         
-        source_urls = grant.get('source_urls', [])
-        if not source_urls:
+        primary_url = self._get_primary_url(grant)
+        if not primary_url:
             return website_info
         
-        # Check the primary source URL
-        primary_url = source_urls[0] if isinstance(source_urls, list) else str(source_urls)
-        
         try:
             response = self.session.get(primary_url, timeout=10, allow_redirects=True)
-            
-            if response.status_code == 404:
-                website_info['website_accessible'] = False
-                website_info['status_confidence'] = 0.9
-                return website_info
-            
-            if response.status_code != 200:
-                website_info['website_accessible'] = False
-                website_info['status_confidence'] = 0.7
-                return website_info
-            
-            # Analyze page content
-            content = response.text.lower()
-            content_analysis = self._analyze_page_content(content)
-            website_info.update(content_analysis)
+            content = response.text if response.status_code == 200 else ''
+            website_info.update(self._analyze_website_response(response.status_code, content))
             
         except requests.RequestException as e:
             logging.warning(f"Could not access {primary_url}: {e}")
@@ -152,6 +178,51 @@ class GrantStatusMonitor:
         
         return website_info
     
+    async def _check_website_status_async(self, session: aiohttp.ClientSession,
+                                          grant: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of _check_website_status using a shared aiohttp session"""
+        website_info = {
+            'website_accessible': True,
+            'website_status_indicators': [],
+            'status_confidence': 0.5
+        }
+        
+        primary_url = self._get_primary_url(grant)
+        if not primary_url:
+            return website_info
+        
+        try:
+            async with session.get(primary_url, timeout=aiohttp.ClientTimeout(total=10),
+                                   allow_redirects=True) as response:
+                content = await response.text(errors='replace') if response.status == 200 else ''
+            website_info.update(self._analyze_website_response(response.status, content))
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.warning(f"Could not access {primary_url}: {e}")
+            website_info['website_accessible'] = False
+            website_info['status_confidence'] = 0.6
+        
+        return website_info
+    
+    def _get_primary_url(self, grant: Dict[str, Any]) -> Optional[str]:
+        """Get the primary source URL of a grant"""
+        source_urls = grant.get('source_urls', [])
+        if not source_urls:
+            return None
+        
+        return source_urls[0] if isinstance(source_urls, list) else str(source_urls)
+    
+    def _analyze_website_response(self, status_code: int, content: str) -> Dict[str, Any]:
+        """Derive website status information from an HTTP response"""
+        if status_code == 404:
+            return {'website_accessible': False, 'status_confidence': 0.9}
+        
+        if status_code != 200:
+            return {'website_accessible': False, 'status_confidence': 0.7}
+        
+        # Analyze page content
+        return self._analyze_page_content(content.lower())
+    
     def _analyze_page_content(self, content: str) -> Dict[str, Any]:
         """Analyze page content for status indicators"""
         analysis = {
@@ -311,6 +382,51 @@ def monitor_grant_status(grant: Dict[str, Any]) -> Dict[str, Any]:
     return updated_grant
 
 
+async def monitor_grant_status_async(session: aiohttp.ClientSession,
+                                     grant: Dict[str, Any],
+                                     monitor: Optional[GrantStatusMonitor] = None) -> Dict[str, Any]:
+    """
+    Monitor status of a single grant using a shared aiohttp session
+    
+    Args:
+        session: Shared aiohttp session
+        grant: Grant dictionary
+        monitor: Optional monitor instance to reuse
+        
+    Returns:
+        Updated grant with status information
+    """
+    monitor = monitor or GrantStatusMonitor()
+    status_info = await monitor.check_grant_status_async(session, grant)
+    
+    updated_grant = grant.copy()
+    updated_grant.update(status_info)
+    
+    return updated_grant
+
+
+async def monitor_grants_status_async(grants: List[Dict[str, Any]],
+                                      max_connections: int = 20) -> List[Dict[str, Any]]:
+    """
+    Monitor status of several grants concurrently
+    
+    Args:
+        grants: List of grant dictionaries
+        max_connections: Maximum number of simultaneous HTTP connections
+        
+    Returns:
+        List of updated grants, in the same order as the input
+    """
+    monitor = GrantStatusMonitor()
+    connector = aiohttp.TCPConnector(limit=max_connections)
+    headers = {'User-Agent': monitor.session.headers['User-Agent']}
+    
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        return await asyncio.gather(*[
+            monitor_grant_status_async(session, grant, monitor) for grant in grants
+        ])
+
+
 if __name__ == "__main__":
     # Test the status monitoring
     test_grant = {
@@ -1,7 +1,8 @@
 import os
+import asyncio
 import json
 import requests
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Dict
 
 class SlackNotifier:
@@ -36,16 +37,20 @@ class SlackNotifier:
             print(f"Failed to send Slack message: {e}")
             return False
     
-    def notify_new_grant(self, grant_data):
-        """Send notification for a new grant"""
-        amount_text = ""
+    @staticmethod
+    def _format_amount(grant_data):
+        """Format a grant's ticket size for a message"""
         if grant_data.get('min_ticket_lakh') and grant_data.get('max_ticket_lakh'):
             if grant_data['min_ticket_lakh'] == grant_data['max_ticket_lakh']:
-                amount_text = f"₹{grant_data['min_ticket_lakh']} Lakh"
-            else:
-                amount_text = f"₹{grant_data['min_ticket_lakh']}-{grant_data['max_ticket_lakh']} Lakh"
+                return f"₹{grant_data['min_ticket_lakh']} Lakh"
+            return f"₹{grant_data['min_ticket_lakh']}-{grant_data['max_ticket_lakh']} Lakh"
         elif grant_data.get('typical_ticket_lakh'):
-            amount_text = f"₹{grant_data['typical_ticket_lakh']} Lakh"
+            return f"₹{grant_data['typical_ticket_lakh']} Lakh"
+        return ""
+    
+    def notify_new_grant(self, grant_data):
+        """Send notification for a new grant"""
+        amount_text = self._format_amount(grant_data)
         
         deadline_text = ""
         if grant_data.get('next_deadline_iso'):
@@ -69,6 +74,22 @@ Sectors: {', '.join(grant_data.get('sector_tags', []))}
         
         return self.send_message(message)
     
+    def notify_new_grants_batch(self, grants, max_listed=20):
+        """Send one notification listing several new grants"""
+        if not grants:
+            return True
+        
+        message = f"🆕 *{len(grants)} New Grants Found!*\n\n"
+        for grant_data in grants[:max_listed]:
+            amount_text = self._format_amount(grant_data) or "Amount TBD"
+            message += f"• *{grant_data['title']}* - {amount_text}\n"
+            message += f"  Agency: {grant_data.get('agency', 'Unknown')}\n"
+        
+        if len(grants) > max_listed:
+            message += f"\n…and {len(grants) - max_listed} more on the dashboard\n"
+        
+        return self.send_message(message)
+    
     def notify_daily_summary(self, grants_found, total_grants):
         """Send daily summary notification"""
         message = f"""📊 *Daily Grant Discovery Summary*
@@ -89,14 +110,25 @@ Visit the dashboard for full details!
             
         message = "⏰ *Grant Deadline Reminders*\n\n"
         
+        today = date.today()
+        reminders = 0
         for grant in grants_expiring_soon:
-            deadline_date = datetime.fromisoformat(grant['next_deadline_iso'].replace('Z', '+00:00'))
-            days_left = (deadline_date - datetime.now()).days
+            # Day granularity: the YYYY-MM-DD prefix is all that's needed, and it
+            # sidesteps mixing offset-aware deadlines with the naive local clock
+            try:
+                deadline = date.fromisoformat(str(grant['next_deadline_iso'])[:10])
+            except ValueError:
+                # One unparsable deadline must not cost the rest their reminders
+                continue
+            days_left = (deadline - today).days
             
             message += f"• *{grant['title']}* - {days_left} days left\n"
             message += f"  Agency: {grant['agency']}\n"
             message += f"  Amount: ₹{grant.get('typical_ticket_lakh', 'TBD')} Lakh\n\n"
+            reminders += 1
         
+        if not reminders:
+            return True
         return self.send_message(message)
     
     def notify_error(self, error_message, component="System"):
@@ -170,9 +202,59 @@ Check the dashboard for full details!"""
 class NotificationManager:
     """Manages all notification channels"""
     
+    # Coalescing of queued new-grant notifications (Slack webhooks allow ~1 msg/s)
+    BATCH_SIZE = 20
+    BATCH_WAIT_SECONDS = 5.0
+    
     def __init__(self):
         self.slack = SlackNotifier()
         self.whatsapp = WhatsAppNotifier()
+        self._grant_queue = None
+        self._flush_task = None
+        
+    def queue_new_grant(self, grant_data):
+        """Queue a new grant for a batched Slack notification (must be called on the event loop)"""
+        if self._flush_task is None:
+            self._grant_queue = asyncio.Queue()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        self._grant_queue.put_nowait(grant_data)
+    
+    async def flush_notifications(self):
+        """Send every queued grant and stop the background sender"""
+        if self._flush_task is None:
+            return
+        self._grant_queue.put_nowait(None)
+        await self._flush_task
+        self._flush_task = None
+    
+    async def _flush_loop(self):
+        """Post queued grants in batches of up to BATCH_SIZE, waiting at most BATCH_WAIT_SECONDS"""
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await self._grant_queue.get()
+            if item is None:
+                break
+            
+            batch = [item]
+            deadline = loop.time() + self.BATCH_WAIT_SECONDS
+            while len(batch) < self.BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._grant_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            # The webhook call is blocking, so it runs off the event loop
+            await asyncio.to_thread(self.slack.notify_new_grants_batch, batch, self.BATCH_SIZE)
+            if not stop:
+                await asyncio.sleep(1)
         
     def notify_new_grant(self, grant_data, whatsapp_numbers=None):
         """Send new grant notification to all channels"""
@@ -187,6 +269,10 @@ class NotificationManager:
         
         return results
     
+    def notify_new_grants_batch(self, grants):
+        """Send a single Slack notification for a batch of new grants"""
+        return self.slack.notify_new_grants_batch(grants)
+    
     def notify_daily_summary(self, grants_found, total_grants):
         """Send daily summary to Slack"""
         return self.slack.notify_daily_summary(grants_found, total_grants)
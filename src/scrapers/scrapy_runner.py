@@ -48,11 +48,14 @@ class ScrapyRunner:
             'startup_india': StartupIndiaSpider
         }
         
+        # Every crawl is scheduled before the reactor starts, so the spiders run
+        # concurrently on one reactor; CONCURRENT_REQUESTS limits each spider,
+        # not the process
         for spider_name in spider_names:
             if spider_name in spider_classes:
                 process.crawl(spider_classes[spider_name])
         
-        # Start the crawling process
+        # Start the crawling process (returns once every spider has finished)
         process.start()
         
     def process_spider_results(self, spider_results):
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the discovery response cache - hits, misses, TTL and page fingerprints
+"""
+
+import asyncio
+import os
+import sys
+
+import aiohttp
+from aiohttp import web
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from agents.discovery_cache import DiscoveryResponseCache
+
+SAMPLE_GRANTS = [{'id': 'seed-fund', 'title': 'Startup India Seed Fund', 'typical_ticket_lakh': 20.0}]
+
+
+def test_hit_and_miss():
+    """A stored extraction is a hit; an unknown key is a miss"""
+    async def run():
+        cache = DiscoveryResponseCache()
+        key = cache.key('https://seedfund.startupindia.gov.in/', 'abc123', 'gpt-4o-mini')
+
+        assert await cache.get(key) is None
+        await cache.set(key, SAMPLE_GRANTS)
+        assert await cache.get(key) == SAMPLE_GRANTS
+        assert cache.get_stats() == {'hits': 1, 'misses': 1}
+        await cache.close()
+
+    asyncio.run(run())
+    print("✅ Cache hits and misses")
+
+
+def test_key_depends_on_content_and_model():
+    """A changed page or another model gets a different key"""
+    cache = DiscoveryResponseCache()
+    url = 'https://birac.nic.in/call_details.aspx'
+    key = cache.key(url, 'abc123', 'gpt-4o-mini')
+
+    assert key == cache.key(url, 'abc123', 'gpt-4o-mini')
+    assert key != cache.key(url, 'def456', 'gpt-4o-mini')
+    assert key != cache.key(url, 'abc123', 'gemini-2.0-flash')
+    print("✅ Cache keys follow page content and model")
+
+
+def test_entries_expire():
+    """Entries are misses once the TTL has passed"""
+    async def run():
+        cache = DiscoveryResponseCache(ttl_seconds=0.05)
+        key = cache.key('https://tdb.gov.in/', 'abc123', 'gpt-4o-mini')
+        await cache.set(key, SAMPLE_GRANTS)
+        assert await cache.get(key) == SAMPLE_GRANTS
+
+        await asyncio.sleep(0.1)
+        assert await cache.get(key) is None
+        assert cache.get_stats() == {'hits': 1, 'misses': 1}
+
+    asyncio.run(run())
+    print("✅ Cache entries expire after the TTL")
+
+
+def test_fingerprint_uses_conditional_get():
+    """An unchanged page is answered by a 304 and keeps its hash"""
+    async def run():
+        page = {'body': b'<html>Seed fund applications open</html>', 'etag': '"v1"'}
+        requests = []
+
+        async def handler(request):
+            requests.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == page['etag']:
+                return web.Response(status=304)
+            return web.Response(body=page['body'], headers={'ETag': page['etag']})
+
+        app = web.Application()
+        app.router.add_get('/', handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f'http://127.0.0.1:{port}/'
+
+        cache = DiscoveryResponseCache()
+        try:
+            async with aiohttp.ClientSession() as session:
+                first = await cache.fingerprint(session, url)
+                second = await cache.fingerprint(session, url)
+                page.update(body=b'<html>Seed fund applications closed</html>', etag='"v2"')
+                third = await cache.fingerprint(session, url)
+        finally:
+            await runner.cleanup()
+
+        assert first and first == second
+        assert third and third != first
+        assert requests == [None, '"v1"', '"v1"']
+
+    asyncio.run(run())
+    print("✅ Fingerprints use conditional GETs")
+
+
+def main():
+    """Run the discovery cache tests"""
+    print("🚀 Testing Discovery Response Cache...")
+    print("=" * 50)
+
+    tests = [
+        test_hit_and_miss,
+        test_key_depends_on_content_and_model,
+        test_entries_expire,
+        test_fingerprint_uses_conditional_get,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
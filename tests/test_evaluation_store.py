@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite source evaluation store
+"""
+
+import os
+import sys
+import tempfile
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from agents.evaluation_store import EvaluationStore
+
+SAMPLE_EVALUATION = {
+    'url': 'https://startup.karnataka.gov.in/',
+    'overall_score': 0.82,
+    'scores': {'relevance_score': 0.9, 'credibility_score': 0.8, 'timeliness_score': 0.6},
+    'categories': ['state', 'incubation']
+}
+
+
+def test_round_trip_and_counters():
+    """A stored evaluation comes back unchanged and counts as a hit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvaluationStore(os.path.join(tmp, 'evaluations.db'))
+        url = SAMPLE_EVALUATION['url']
+
+        assert store.get(url, 'gpt-4o-mini') is None
+        store.set(url, 'gpt-4o-mini', SAMPLE_EVALUATION)
+        assert store.get(url, 'gpt-4o-mini') == SAMPLE_EVALUATION
+        assert store.get_stats() == {'hits': 1, 'misses': 1}
+        store.close()
+    print("✅ Evaluations round-trip and are counted")
+
+
+def test_keyed_by_model():
+    """Another model does not reuse the evaluation"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvaluationStore(os.path.join(tmp, 'evaluations.db'))
+        store.set(SAMPLE_EVALUATION['url'], 'gpt-4o-mini', SAMPLE_EVALUATION)
+        assert store.get(SAMPLE_EVALUATION['url'], 'gemini-2.0-flash') is None
+        store.close()
+    print("✅ Evaluations are keyed by model")
+
+
+def test_survives_restart():
+    """A new store on the same file sees earlier evaluations"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'evaluations.db')
+        store = EvaluationStore(path)
+        store.set(SAMPLE_EVALUATION['url'], 'gpt-4o-mini', SAMPLE_EVALUATION)
+        store.close()
+
+        reopened = EvaluationStore(path)
+        assert reopened.get(SAMPLE_EVALUATION['url'], 'gpt-4o-mini') == SAMPLE_EVALUATION
+        reopened.close()
+    print("✅ Evaluations survive a restart")
+
+
+def test_expired_evaluation_is_a_miss():
+    """Evaluations older than the TTL are redone"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EvaluationStore(os.path.join(tmp, 'evaluations.db'), ttl_seconds=0)
+        store.set(SAMPLE_EVALUATION['url'], 'gpt-4o-mini', SAMPLE_EVALUATION)
+        assert store.get(SAMPLE_EVALUATION['url'], 'gpt-4o-mini') is None
+        assert store.get_stats() == {'hits': 0, 'misses': 1}
+        store.close()
+    print("✅ Expired evaluations are misses")
+
+
+def test_unusable_path_degrades_to_misses():
+    """A store that cannot open its file misses instead of raising"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # A directory cannot be opened as a database
+        store = EvaluationStore(tmp)
+        store.set(SAMPLE_EVALUATION['url'], 'gpt-4o-mini', SAMPLE_EVALUATION)
+        assert store.get(SAMPLE_EVALUATION['url'], 'gpt-4o-mini') is None
+        store.close()
+    print("✅ Unusable store path degrades to misses")
+
+
+def main():
+    """Run the evaluation store tests"""
+    print("🚀 Testing Evaluation Store...")
+    print("=" * 50)
+
+    tests = [
+        test_round_trip_and_counters,
+        test_keyed_by_model,
+        test_survives_restart,
+        test_expired_evaluation_is_a_miss,
+        test_unusable_path_degrades_to_misses,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
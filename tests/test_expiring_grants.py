@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for DatabaseManager.get_expiring_grants - the SQL deadline window
+
+Runs against DATABASE_URL (PostgreSQL in CI), or a throwaway SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from database.models import DatabaseManager, Grant
+
+ID_PREFIX = 'testexpiring'
+
+
+def _day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+# id suffix -> (next_deadline_iso, status)
+DEADLINES = {
+    'soon': (_day(3), 'live'),
+    'last_day_with_time': (_day(7) + 'T23:59:00+05:30', 'live'),
+    'overdue': (_day(-2), 'live'),
+    'next_month': (_day(30), 'live'),
+    'day_after_window': (_day(8), 'live'),
+    'not_iso': ('15 March 2026', 'live'),
+    'slashed': (date.today().strftime('%d/%m/%Y'), 'live'),
+    'no_deadline': (None, 'live'),
+    'expired': (_day(1), 'expired'),
+}
+GRANT_IDS = [ID_PREFIX + suffix for suffix in DEADLINES]
+
+
+def _database_manager():
+    database_url = os.getenv('DATABASE_URL') or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'grants.db')
+    db_manager = DatabaseManager(database_url)
+    db_manager.create_tables()
+    _cleanup(db_manager)
+
+    session = db_manager.get_session()
+    try:
+        for suffix, (deadline, status) in DEADLINES.items():
+            session.add(Grant(id=ID_PREFIX + suffix, title=f'Grant {suffix}', agency='Test Agency',
+                              next_deadline_iso=deadline, status=status, typical_ticket_lakh=10.0))
+        session.commit()
+    finally:
+        session.close()
+    return db_manager
+
+
+def _cleanup(db_manager):
+    session = db_manager.get_session()
+    try:
+        session.query(Grant).filter(Grant.id.in_(GRANT_IDS)).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _expiring_suffixes(db_manager, days):
+    return {
+        grant['id'][len(ID_PREFIX):]
+        for grant in db_manager.get_expiring_grants(days=days)
+        if grant['id'].startswith(ID_PREFIX)
+    }
+
+
+def test_window_is_inclusive_of_its_last_day():
+    """Live ISO deadlines up to the end of the window's last day are returned"""
+    db_manager = _database_manager()
+    try:
+        assert _expiring_suffixes(db_manager, days=7) == {'soon', 'last_day_with_time', 'overdue'}
+        assert _expiring_suffixes(db_manager, days=8) == {'soon', 'last_day_with_time', 'overdue', 'day_after_window'}
+    finally:
+        _cleanup(db_manager)
+    print("✅ Expiring window includes its last day")
+
+
+def test_unparsable_and_closed_grants_are_left_out():
+    """Non-ISO deadlines, missing deadlines and non-live grants never match"""
+    db_manager = _database_manager()
+    try:
+        found = _expiring_suffixes(db_manager, days=365)
+        assert found.isdisjoint({'not_iso', 'slashed', 'no_deadline', 'expired'})
+        assert 'next_month' in found
+    finally:
+        _cleanup(db_manager)
+    print("✅ Unparsable deadlines and closed grants are left out")
+
+
+def test_result_shape():
+    """Each expiring grant is a dict of the fields the reminders use"""
+    db_manager = _database_manager()
+    try:
+        grant = next(g for g in db_manager.get_expiring_grants(days=7) if g['id'] == ID_PREFIX + 'soon')
+        assert grant == {
+            'id': ID_PREFIX + 'soon',
+            'title': 'Grant soon',
+            'agency': 'Test Agency',
+            'next_deadline_iso': _day(3),
+            'typical_ticket_lakh': 10.0,
+        }
+    finally:
+        _cleanup(db_manager)
+    print("✅ Expiring grants carry the reminder fields")
+
+
+def main():
+    """Run the expiring grants tests"""
+    print("🚀 Testing Expiring Grants...")
+    print("=" * 50)
+
+    tests = [
+        test_window_is_inclusive_of_its_last_day,
+        test_unparsable_and_closed_grants_are_left_out,
+        test_result_shape,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
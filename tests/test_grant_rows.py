@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for DatabaseManager.iter_grant_rows - keyset batches on the read engine
+
+Runs against DATABASE_URL (PostgreSQL in CI), or a throwaway SQLite file.
+"""
+
+import os
+import sys
+import tempfile
+
+import orjson
+
+# Add the repository root and src to Python path
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+
+import simple_api
+from database.models import DatabaseManager, Grant
+
+# Letters and digits only, so the ids sort the same under any collation
+ID_PREFIX = 'testrows'
+GRANT_IDS = [f'{ID_PREFIX}{i:02d}' for i in range(8)]
+
+
+def _database_manager():
+    database_url = os.getenv('DATABASE_URL') or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'grants.db')
+    db_manager = DatabaseManager(database_url)
+    db_manager.create_tables()
+
+    session = db_manager.get_session()
+    try:
+        session.query(Grant).filter(Grant.id.in_(GRANT_IDS)).delete(synchronize_session=False)
+        for grant_id in reversed(GRANT_IDS):
+            session.add(Grant(id=grant_id, title=f'Grant {grant_id}', agency='Test Agency', status='live'))
+        session.commit()
+    finally:
+        session.close()
+    return db_manager
+
+
+def _cleanup(db_manager):
+    session = db_manager.get_session()
+    try:
+        session.query(Grant).filter(Grant.id.in_(GRANT_IDS)).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_all_rows_in_id_order_across_batches():
+    """Every row comes back once, in id order, whatever the batch size"""
+    db_manager = _database_manager()
+    try:
+        rows = list(db_manager.iter_grant_rows(['id', 'title'], batch_size=3))
+        ours = [row for row in rows if row['id'].startswith(ID_PREFIX)]
+        assert [row['id'] for row in ours] == GRANT_IDS
+        assert ours[0] == {'id': GRANT_IDS[0], 'title': f'Grant {GRANT_IDS[0]}'}
+        assert len({row['id'] for row in rows}) == len(rows)
+    finally:
+        _cleanup(db_manager)
+    print("✅ All rows stream in id order across batches")
+
+
+def test_cursor_and_limit():
+    """Pages start after the cursor and stop at the limit, even mid-batch"""
+    db_manager = _database_manager()
+    try:
+        page = list(db_manager.iter_grant_rows(['id'], cursor=ID_PREFIX, limit=5, batch_size=2))
+        assert [row['id'] for row in page] == GRANT_IDS[:5]
+
+        next_page = list(db_manager.iter_grant_rows(['id'], cursor=page[-1]['id'], limit=2, batch_size=2))
+        assert [row['id'] for row in next_page] == GRANT_IDS[5:7]
+    finally:
+        _cleanup(db_manager)
+    print("✅ Cursor and limit page through the grants")
+
+
+def test_columns_without_id():
+    """The id is used for paging but only the requested columns are returned"""
+    db_manager = _database_manager()
+    try:
+        rows = list(db_manager.iter_grant_rows(['title', 'agency'], cursor=ID_PREFIX, limit=3, batch_size=2))
+        assert rows == [{'title': f'Grant {grant_id}', 'agency': 'Test Agency'} for grant_id in GRANT_IDS[:3]]
+    finally:
+        _cleanup(db_manager)
+    print("✅ Only the requested columns are returned")
+
+
+def test_simple_api_grants_endpoint():
+    """/grants serves the JSON payload and the NDJSON pages from the read engine"""
+    db_manager = _database_manager()
+    original_db_manager = simple_api.db_manager
+    simple_api.db_manager = db_manager
+    simple_api._payload_cache.clear()
+    try:
+        client = simple_api.app.test_client()
+
+        response = client.get('/grants')
+        assert response.status_code == 200, response.get_data(as_text=True)
+        ours = [grant for grant in response.get_json()['grants'] if grant['id'].startswith(ID_PREFIX)]
+        assert [grant['id'] for grant in ours] == GRANT_IDS
+        assert set(ours[0]) == set(simple_api.GRANT_FIELDS)
+
+        response = client.get('/grants', query_string={'cursor': ID_PREFIX, 'limit': 3})
+        assert response.status_code == 200
+        lines = response.get_data().splitlines()
+        assert [orjson.loads(line)['id'] for line in lines] == GRANT_IDS[:3]
+    finally:
+        simple_api.db_manager = original_db_manager
+        simple_api._payload_cache.clear()
+        _cleanup(db_manager)
+    print("✅ /grants serves JSON and NDJSON pages")
+
+
+def main():
+    """Run the grant row streaming tests"""
+    print("🚀 Testing Grant Row Streaming...")
+    print("=" * 50)
+
+    tests = [
+        test_all_rows_in_id_order_across_batches,
+        test_cursor_and_limit,
+        test_columns_without_id,
+        test_simple_api_grants_endpoint,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
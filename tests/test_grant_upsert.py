@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for DatabaseManager.upsert_grants_bulk - the prepared grant_upsert and the ORM path
+
+Runs against DATABASE_URL (PostgreSQL in CI, which takes the prepared
+statement), or a throwaway SQLite file (the ORM path).
+"""
+
+import os
+import sys
+import tempfile
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from database.models import DatabaseManager, Grant, GrantRecord
+
+ID_PREFIX = 'testupsert'
+GRANT_IDS = [f'{ID_PREFIX}{i:02d}' for i in range(4)]
+
+
+def _database_manager():
+    database_url = os.getenv('DATABASE_URL') or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'grants.db')
+    db_manager = DatabaseManager(database_url)
+    db_manager.create_tables()
+    _cleanup(db_manager)
+    return db_manager
+
+
+def _cleanup(db_manager):
+    session = db_manager.get_session()
+    try:
+        session.query(Grant).filter(Grant.id.in_(GRANT_IDS)).delete(synchronize_session=False)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _load(db_manager, grant_id):
+    session = db_manager.get_session()
+    try:
+        return session.query(Grant).filter(Grant.id == grant_id).one()
+    finally:
+        session.close()
+
+
+def test_insert_then_partial_update():
+    """New grants get the column defaults; updates only touch the fields they carry"""
+    db_manager = _database_manager()
+    try:
+        saved = db_manager.upsert_grants_bulk([
+            {'id': GRANT_IDS[0], 'title': 'Seed Fund', 'agency': 'DPIIT', 'instrument': ['grant'],
+             'typical_ticket_lakh': 20.0},
+            GrantRecord(id=GRANT_IDS[1], title='BIG', sector_tags=['biotech'], source_url='https://birac.nic.in/'),
+        ])
+        assert len(saved) == 2
+
+        grant = _load(db_manager, GRANT_IDS[0])
+        assert grant.instrument == ['grant'] and grant.typical_ticket_lakh == 20.0
+        assert grant.status == 'live' and grant.application_complexity == 'medium'
+        assert grant.is_duplicate is False and grant.created_iso is not None
+        assert _load(db_manager, GRANT_IDS[1]).sector_tags == ['biotech']
+
+        saved = db_manager.upsert_grants_bulk([
+            {'id': GRANT_IDS[0], 'title': 'Seed Fund 2026', 'instrument': ['grant', 'debt']}
+        ])
+        assert len(saved) == 1
+
+        updated = _load(db_manager, GRANT_IDS[0])
+        assert updated.title == 'Seed Fund 2026' and updated.instrument == ['grant', 'debt']
+        assert updated.agency == 'DPIIT' and updated.typical_ticket_lakh == 20.0
+        assert updated.created_iso == grant.created_iso
+        assert updated.last_seen_iso >= grant.last_seen_iso
+    finally:
+        _cleanup(db_manager)
+    print("✅ Bulk upsert inserts with defaults and updates in place")
+
+
+def test_bad_record_keeps_the_rest():
+    """A record that cannot be saved does not drop the rest of its batch"""
+    db_manager = _database_manager()
+    try:
+        batch = [
+            {'id': GRANT_IDS[0], 'title': 'Seed Fund'},
+            {'id': GRANT_IDS[1], 'title': None},
+            {'id': GRANT_IDS[2], 'title': 'Samridh'},
+        ]
+        saved = db_manager.upsert_grants_bulk(batch, batch_size=3)
+        assert [grant['id'] for grant in saved] == [GRANT_IDS[0], GRANT_IDS[2]]
+
+        session = db_manager.get_session()
+        try:
+            stored = {grant_id for (grant_id,) in session.query(Grant.id).filter(Grant.id.in_(GRANT_IDS))}
+        finally:
+            session.close()
+        assert stored == {GRANT_IDS[0], GRANT_IDS[2]}
+    finally:
+        _cleanup(db_manager)
+    print("✅ A bad record is dropped on its own")
+
+
+def test_prepared_upsert_on_postgres():
+    """On psycopg2 the batch goes through EXECUTE grant_upsert, prepared once per connection"""
+    db_manager = _database_manager()
+    rows = [{'id': GRANT_IDS[3], 'title': 'NIDHI PRAYAS', 'eligibility_flags': ['dpiit_recognised']}]
+    if not db_manager._can_use_prepared_upsert(rows):
+        print("⚠️  Not on PostgreSQL with psycopg2, skipping prepared upsert test")
+        return
+
+    try:
+        db_manager._upsert_rows_prepared(rows)
+        db_manager._upsert_rows_prepared([{'id': GRANT_IDS[3], 'title': 'NIDHI PRAYAS 2026'}])
+
+        grant = _load(db_manager, GRANT_IDS[3])
+        assert grant.title == 'NIDHI PRAYAS 2026'
+        assert grant.eligibility_flags == ['dpiit_recognised']
+        assert grant.status == 'live' and grant.is_duplicate is False
+
+        # Rows with columns outside the prepared statement take the ORM path
+        assert not db_manager._can_use_prepared_upsert([{'id': GRANT_IDS[3], 'title': 'x', 'original_id': 'y'}])
+    finally:
+        _cleanup(db_manager)
+    print("✅ Prepared grant upsert")
+
+
+def main():
+    """Run the grant upsert tests"""
+    print("🚀 Testing Grant Upserts...")
+    print("=" * 50)
+
+    tests = [
+        test_insert_then_partial_update,
+        test_bad_record_keeps_the_rest,
+        test_prepared_upsert_on_postgres,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
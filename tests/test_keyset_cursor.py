@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the enhanced API's keyset pagination cursors
+
+Importing enhanced_api opens its connection pool, so DATABASE_URL must point
+at a reachable database; the tests below never query it.
+"""
+
+import base64
+import os
+import sys
+from decimal import Decimal
+
+# Add the repository root and src to Python path
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+
+import enhanced_api
+from enhanced_api import app, keyset_after, next_cursor
+
+ROWS = [
+    {'id': 'grant-b', 'confidence': Decimal('0.90'), 'typical_ticket_lakh': Decimal('50.0')},
+    {'id': 'grant-a', 'confidence': Decimal('0.75'), 'typical_ticket_lakh': None},
+]
+
+
+def test_cursor_round_trip():
+    """The cursor for a full page decodes to the last row's keyset position"""
+    cursor = next_cursor(ROWS, limit=2)
+    assert cursor is not None
+
+    with app.test_request_context(f'/grants?cursor={cursor}'):
+        assert keyset_after() == ['0.75', '0', 'grant-a']
+    print("✅ Cursors round-trip to the last row's position")
+
+
+def test_last_page_has_no_cursor():
+    """A page shorter than the limit is the last one"""
+    assert next_cursor(ROWS, limit=3) is None
+    assert next_cursor([], limit=0) is None
+    print("✅ The last page has no cursor")
+
+
+def test_limit_below_one_is_rejected():
+    """limit=0 and negative limits get a 400 before any query runs"""
+    client = app.test_client()
+    for limit in (0, -1):
+        response = client.get('/grants', query_string={'limit': limit})
+        assert response.status_code == 400, (limit, response.status_code)
+        assert response.get_json() == {'error': 'limit must be at least 1'}
+    print("✅ Limits below one are rejected with 400")
+
+
+def test_explicit_after_parameters():
+    """after_* parameters are accepted in place of a cursor"""
+    with app.test_request_context('/grants?after_id=grant-a&after_confidence=0.75'):
+        assert keyset_after() == ['0.75', '0', 'grant-a']
+    with app.test_request_context('/grants'):
+        assert keyset_after() is None
+    print("✅ Explicit after_* parameters")
+
+
+def test_bad_cursor_is_rejected():
+    """Malformed cursors get a 400 before any query runs"""
+    client = app.test_client()
+    bad_cursors = [
+        'not-base64!!',
+        base64.urlsafe_b64encode(b'not json').decode('ascii'),
+        base64.urlsafe_b64encode(b'[1, 2]').decode('ascii'),
+        base64.urlsafe_b64encode(b'42').decode('ascii'),
+    ]
+    for path in ('/grants', '/grants/search'):
+        for cursor in bad_cursors:
+            response = client.get(path, query_string={'cursor': cursor})
+            assert response.status_code == 400, (path, cursor, response.status_code)
+            assert response.get_json() == {'error': 'Invalid pagination cursor'}
+    print("✅ Bad cursors are rejected with 400")
+
+
+def test_only_successes_are_cached():
+    """Error responses are kept out of the view cache"""
+    with app.test_request_context('/grants'):
+        assert enhanced_api.is_cacheable(enhanced_api.ojsonify({'grants': []}))
+        assert not enhanced_api.is_cacheable(enhanced_api.ojsonify({'error': 'bad'}, 400))
+        assert not enhanced_api.is_cacheable(enhanced_api.ojsonify({'error': 'down'}, 500))
+    print("✅ Only successful responses are cached")
+
+
+def main():
+    """Run the keyset cursor tests"""
+    print("🚀 Testing Keyset Pagination Cursors...")
+    print("=" * 50)
+
+    tests = [
+        test_cursor_round_trip,
+        test_last_page_has_no_cursor,
+        test_limit_below_one_is_rejected,
+        test_explicit_after_parameters,
+        test_bad_cursor_is_rejected,
+        test_only_successes_are_cached,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM gate - AIMD concurrency halving and recovery
+"""
+
+import asyncio
+import os
+import sys
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from agents.llm_gate import LLMGate
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class RateLimitError(Exception):
+    """Provider error shaped like the OpenAI client's 429"""
+
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = FakeResponse({'retry-after': '0'})
+
+
+async def _succeed():
+    return 'ok'
+
+
+async def _rate_limited():
+    raise RateLimitError()
+
+
+def test_overload_halves_limit():
+    """A 429 halves the concurrency limit, down to the minimum"""
+    async def run():
+        gate = LLMGate(max_concurrency=8, min_concurrency=2)
+        for expected in (4, 2, 2):
+            try:
+                await gate.call(_rate_limited, retries=0)
+            except RateLimitError:
+                pass
+            else:
+                raise AssertionError("the 429 should propagate when retries are exhausted")
+            assert int(gate.limit) == expected, gate.get_stats()
+        assert gate.stats['overloads'] == 3
+
+    asyncio.run(run())
+    print("✅ Overloads halve the limit down to min_concurrency")
+
+
+def test_healthy_calls_recover_limit():
+    """Healthy calls grow the limit back to max_concurrency, and no further"""
+    async def run():
+        gate = LLMGate(max_concurrency=8)
+        try:
+            await gate.call(_rate_limited, retries=0)
+        except RateLimitError:
+            pass
+        assert int(gate.limit) == 4
+
+        # Growing from 4 to 8 by 1/limit per call takes about 24 calls
+        for _ in range(40):
+            assert await gate.call(_succeed) == 'ok'
+        assert gate.limit == 8, gate.get_stats()
+
+    asyncio.run(run())
+    print("✅ Healthy calls recover the limit to max_concurrency")
+
+
+def test_limit_caps_in_flight_calls():
+    """No more calls run at once than the current limit"""
+    async def run():
+        gate = LLMGate(max_concurrency=3)
+        in_flight = peak = 0
+
+        async def slow_call():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        await asyncio.gather(*(gate.call(slow_call) for _ in range(12)))
+        assert peak == 3, peak
+        assert gate.get_stats()['in_flight'] == 0
+
+    asyncio.run(run())
+    print("✅ In-flight calls stay under the limit")
+
+
+def test_overload_is_retried():
+    """An overloaded call is retried and succeeds once the provider recovers"""
+    async def run():
+        gate = LLMGate(max_concurrency=4)
+        attempts = 0
+
+        async def flaky_call():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise RateLimitError()
+            return 'ok'
+
+        assert await gate.call(flaky_call, retries=2) == 'ok'
+        assert attempts == 2
+        assert gate.stats['retries'] == 1
+
+    asyncio.run(run())
+    print("✅ Overloaded calls are retried")
+
+
+def main():
+    """Run the LLM gate tests"""
+    print("🚀 Testing LLM Gate...")
+    print("=" * 50)
+
+    tests = [
+        test_overload_halves_limit,
+        test_healthy_calls_recover_limit,
+        test_limit_caps_in_flight_calls,
+        test_overload_is_retried,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
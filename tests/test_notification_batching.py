@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched new-grant Slack notifications - NotificationManager's flush loop
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from notifications.slack_notifier import NotificationManager
+
+
+class RecordingSlack:
+    """Stands in for SlackNotifier and records each batch it is asked to post"""
+
+    def __init__(self):
+        self.batches = []
+
+    def notify_new_grants_batch(self, grants, max_listed=20):
+        self.batches.append(([grant['id'] for grant in grants], max_listed))
+        return True
+
+
+def _manager(batch_size=5, batch_wait_seconds=0.05):
+    manager = NotificationManager()
+    manager.slack = RecordingSlack()
+    manager.BATCH_SIZE = batch_size
+    manager.BATCH_WAIT_SECONDS = batch_wait_seconds
+    return manager
+
+
+def test_full_batches_in_order():
+    """Queued grants go out in order, at most BATCH_SIZE per message"""
+    async def run():
+        manager = _manager(batch_size=5, batch_wait_seconds=10)
+        for i in range(12):
+            manager.queue_new_grant({'id': i})
+        await manager.flush_notifications()
+        return manager.slack.batches
+
+    batches = asyncio.run(run())
+    assert [ids for ids, _ in batches] == [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11]]
+    assert all(max_listed == 5 for _, max_listed in batches)
+    print("✅ Grants are posted in full batches, in order")
+
+
+def test_partial_batch_after_wait():
+    """A partial batch is posted once BATCH_WAIT_SECONDS pass, without a flush"""
+    async def run():
+        manager = _manager(batch_size=5, batch_wait_seconds=0.05)
+        manager.queue_new_grant({'id': 'a'})
+        manager.queue_new_grant({'id': 'b'})
+        await asyncio.sleep(0.3)
+        posted_before_flush = [ids for ids, _ in manager.slack.batches]
+
+        manager.queue_new_grant({'id': 'c'})
+        await manager.flush_notifications()
+        return posted_before_flush, [ids for ids, _ in manager.slack.batches]
+
+    posted_before_flush, batches = asyncio.run(run())
+    assert posted_before_flush == [['a', 'b']]
+    assert batches == [['a', 'b'], ['c']]
+    print("✅ Partial batches are posted after the wait")
+
+
+def test_flush_stops_and_restarts():
+    """Flushing with nothing queued is a no-op; queueing after a flush starts a new sender"""
+    async def run():
+        manager = _manager()
+        await manager.flush_notifications()
+        assert manager.slack.batches == []
+
+        manager.queue_new_grant({'id': 1})
+        started = time.monotonic()
+        await manager.flush_notifications()
+        # The stop marker ends the wait instead of BATCH_WAIT_SECONDS running out
+        assert time.monotonic() - started < 1
+        assert manager._flush_task is None
+
+        manager.queue_new_grant({'id': 2})
+        await manager.flush_notifications()
+        return [ids for ids, _ in manager.slack.batches]
+
+    assert asyncio.run(run()) == [[1], [2]]
+    print("✅ Flush stops the sender and a new one starts on demand")
+
+
+def main():
+    """Run the notification batching tests"""
+    print("🚀 Testing Notification Batching...")
+    print("=" * 50)
+
+    tests = [
+        test_full_batches_in_order,
+        test_partial_batch_after_wait,
+        test_flush_stops_and_restarts,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the orchestrator's URL state - Bloom filter and Redis-backed sets
+"""
+
+import os
+import random
+import string
+import sys
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from agents.url_state import BloomFilter, RedisSet, REDIS_AVAILABLE
+
+if REDIS_AVAILABLE:
+    import redis
+
+
+def _random_urls(count, seed):
+    rng = random.Random(seed)
+    return [
+        'https://' + ''.join(rng.choices(string.ascii_lowercase, k=12)) + '.gov.in/' +
+        ''.join(rng.choices(string.ascii_lowercase + string.digits, k=16))
+        for _ in range(count)
+    ]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Every added value is reported present"""
+    bloom = BloomFilter(capacity=20_000, error_rate=0.001)
+    urls = _random_urls(20_000, seed=1)
+    for url in urls:
+        bloom.add(url)
+
+    missing = [url for url in urls if url not in bloom]
+    assert not missing, f"{len(missing)} added URLs reported absent"
+    print("✅ Bloom filter reports every added URL")
+
+
+def test_bloom_filter_false_positive_rate():
+    """Absent values are rarely reported present at capacity"""
+    bloom = BloomFilter(capacity=20_000, error_rate=0.01)
+    for url in _random_urls(20_000, seed=2):
+        bloom.add(url)
+
+    absent = _random_urls(20_000, seed=3)
+    false_positives = sum(1 for url in absent if url in bloom)
+    # Expected about 1%; allow generous slack so the test is not flaky
+    assert false_positives / len(absent) < 0.03, false_positives
+    print(f"✅ Bloom filter false positive rate {false_positives / len(absent):.2%}")
+
+
+def test_local_set_without_redis():
+    """Without Redis the set lives in process memory"""
+    targets = RedisSet(None, 'target_urls')
+    processed = RedisSet(None, 'processed_urls', bloom=BloomFilter(capacity=100))
+    for url in ('a', 'b', 'c'):
+        targets.add(url)
+    processed.add('b')
+
+    assert len(targets) == 3
+    assert 'b' in processed and 'a' not in processed
+    assert targets - processed == {'a', 'c'}
+    targets.discard('c')
+    assert set(targets) == {'a', 'b'}
+    print("✅ In-memory URL sets")
+
+
+class FlakyRedis:
+    """Minimal Redis SET commands that fail while down is True"""
+
+    def __init__(self):
+        self.down = False
+        self.sets = {}
+
+    def _check(self):
+        if self.down:
+            raise redis.ConnectionError("Redis is down")
+
+    def sscan_iter(self, key, count=None):
+        self._check()
+        return iter(set(self.sets.get(key, ())))
+
+    def sadd(self, key, *values):
+        self._check()
+        self.sets.setdefault(key, set()).update(values)
+
+    def srem(self, key, value):
+        self._check()
+        self.sets.get(key, set()).discard(value)
+
+    def smembers(self, key):
+        self._check()
+        return set(self.sets.get(key, ()))
+
+    def sismember(self, key, value):
+        self._check()
+        return value in self.sets.get(key, ())
+
+    def scard(self, key):
+        self._check()
+        return len(self.sets.get(key, ()))
+
+    def sdiff(self, key, other):
+        self._check()
+        return self.sets.get(key, set()) - self.sets.get(other, set())
+
+
+def test_bloom_backed_set_survives_redis_outage():
+    """Writes during an outage are readable locally and reach Redis afterwards"""
+    if not REDIS_AVAILABLE:
+        print("⚠️  redis not installed, skipping outage test")
+        return
+
+    client = FlakyRedis()
+    targets = RedisSet(client, 'target_urls')
+    processed = RedisSet(client, 'processed_urls', bloom=BloomFilter(capacity=100))
+    targets.add('a')
+    targets.add('b')
+
+    client.down = True
+    processed.add('a')
+    assert len(processed) == 1
+    assert processed.members() == {'a'}
+    assert 'a' in processed and 'b' not in processed
+    assert targets - processed == {'b'}
+
+    client.down = False
+    processed.add('b')
+    assert client.sets['orchestrator:processed_urls'] == {'a', 'b'}
+    assert targets - processed == set()
+    print("✅ Bloom-backed set keeps writes through a Redis outage")
+
+
+def main():
+    """Run the URL state tests"""
+    print("🚀 Testing URL State...")
+    print("=" * 50)
+
+    tests = [
+        test_bloom_filter_has_no_false_negatives,
+        test_bloom_filter_false_positive_rate,
+        test_local_set_without_redis,
+        test_bloom_backed_set_survives_redis_outage,
+    ]
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__} failed: {e!r}")
+
+    print("=" * 50)
+    print(f"📊 {len(tests) - failed}/{len(tests)} tests passed")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)